@@ -7,18 +7,69 @@
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
 import copy
+import os
 import pykern.fconf
 import pykern.pkresource
 import pykern.util
 import slicops.config
 import slicops.field
 import slicops.ui_layout
+import threading
+
+#: Parsed sliclet yaml by path, see `Ctx.__compiled`
+_compiled = PKDict()
+
+_compiled_lock = threading.Lock()
 
 
 class Ctx:
     __TOP_KEYS = frozenset(("fields", "ui_layout"))
 
     def __init__(self, name, title, path=None):
+        self.name = name
+        self.title = title
+        c = self.__compiled(path)
+        # fields are copy on write (see slicops.field.Base.renew) so
+        # only the dict needs to be copied for each Ctx
+        self.fields = PKDict(c.fields)
+        self.ui_layout = c.ui_layout
+        # Incremented by each commit which changes fields
+        self.version = 0
+        self.field_versions = PKDict((k, 0) for k in self.fields)
+
+    def as_dict(self):
+        return PKDict(
+            fields=PKDict((k, v.as_dict()) for k, v in self.fields.items()),
+            ui_layout=PKDict(rows=copy.deepcopy(self.ui_layout.rows)),
+        )
+
+    def first_time(self):
+        u = self.as_dict()
+        u.sliclet_title = self.title
+        u.sliclet_name = self.name
+        u.version = self.version
+        return u
+
+    def since(self, version):
+        """Fields changed after version so a client can resync
+
+        Args:
+            version (int): last version the client applied
+        Returns:
+            PKDict: fields (complete) and version
+        """
+        return PKDict(
+            fields=PKDict(
+                (k, self.fields[k].as_dict())
+                for k, v in self.field_versions.items()
+                if v > version
+            ),
+            version=self.version,
+        )
+
+    def __compiled(self, path):
+        """Parsed and validated yaml, which is cached until the file changes"""
+
         def _check_raw(got):
             if not isinstance(got, dict):
                 raise ValueError(f"expecting a dict, not type={type(got)}")
@@ -28,48 +79,49 @@ class Ctx:
             if x := self.__TOP_KEYS - g:
                 raise ValueError(f"missing keys={x}")
 
-        self.name = name
-        self.title = title
+        def _stat(path):
+            s = os.stat(path)
+            return (s.st_mtime_ns, s.st_size)
 
         step = "yaml"
         try:
-            n = f"sliclet/{name}.yaml"
-            r = pykern.fconf.Parser(
-                [
-                    (
-                        path.join(n)
-                        if path
-                        else pykern.pkresource.file_path(
-                            n,
-                            packages=slicops.config.cfg().package_path,
-                        )
-                    )
-                ]
-            ).result
-            _check_raw(r)
-            step = "fields"
-            self.fields = self.__parse(r[step], PKDict(), slicops.field.prototypes())
-            step = "ui_layout"
-            self.ui_layout = slicops.ui_layout.UILayout(r[step], self)
+            n = f"sliclet/{self.name}.yaml"
+            p = (
+                path.join(n)
+                if path
+                else pykern.pkresource.file_path(
+                    n,
+                    packages=slicops.config.cfg().package_path,
+                )
+            )
+            k = str(p)
+            s = _stat(k)
+            if (rv := _compiled.get(k)) is not None and rv.stat == s:
+                return rv
+            with _compiled_lock:
+                if (rv := _compiled.get(k)) is not None and rv.stat == s:
+                    return rv
+                r = pykern.fconf.Parser([p]).result
+                _check_raw(r)
+                step = "fields"
+                # UILayout checks cells against self.fields
+                self.fields = self.__parse(
+                    r[step], PKDict(), slicops.field.prototypes()
+                )
+                step = "ui_layout"
+                rv = _compiled[k] = PKDict(
+                    fields=self.fields,
+                    stat=s,
+                    ui_layout=slicops.ui_layout.UILayout(r[step], self),
+                )
+                return rv
         except Exception as e:
             # TODO(robnagler) eventually use add_note
             if not (x := getattr(e, "args", None)):
                 x = ()
-            e.args = x + (f"parsing {step} for sliclet={name}",)
+            e.args = x + (f"parsing {step} for sliclet={self.name}",)
             raise e
 
-    def as_dict(self):
-        return PKDict(
-            fields=PKDict((k, v.as_dict()) for k, v in self.fields.items()),
-            ui_layout=PKDict(rows=copy.deepcopy(self.ui_layout.rows)),
-        )
-
-    def first_time(self):
-        u = self.as_dict()
-        u.sliclet_title = self.title
-        u.sliclet_name = self.name
-        return u
-
     def __parse(self, raw, fields, prototypes):
 
         def _one(name, attrs, prototype):
@@ -107,22 +159,28 @@ class Txn:
         self.__updates = PKDict()
 
     def commit(self, update):
-
-        def _pairs(updates):
+        def _changes(updates):
             for k, v in updates.items():
-                yield k, v.as_dict()
+                if x := v.changes(c.fields[k]):
+                    yield k, x
 
         c = self.__ctx
         u = self.__updates
         self.__ctx = self.__updates = None
         if not u:
             return
+        d = PKDict(_changes(u))
         # could technically do collision checking on the update
         c.fields.update(u)
-        # TODO(robnagler) only send changes and protect large data being sent
-        # screen protects against this by clearing plot when irrelevant
+        if not d:
+            return
+        c.version += 1
+        for k in d:
+            c.field_versions[k] = c.version
+        # Only changed attrs are sent; screen still protects against
+        # large data by clearing plot when irrelevant
         if update:
-            update(PKDict(fields=PKDict(_pairs(u))))
+            update(PKDict(fields=d, version=c.version))
 
     def is_field_value_valid(self, name, value):
         return not isinstance(
@@ -220,5 +278,5 @@ class Txn:
         return self.__ctx.fields[name]
 
     def __field_update(self, name, field, overrides):
-        rv = self.__updates[name] = field.renew(copy.deepcopy(overrides))
+        rv = self.__updates[name] = field.renew(slicops.field.deepcopy(overrides))
         return rv
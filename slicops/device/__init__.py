@@ -6,13 +6,30 @@
 
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import asyncio
+import collections
 import epics
+import functools
+import pykern.pkconfig
 import slicops.device_db
+import slicops.latency
 import threading
+import time
 
 # TODO(robnagler) configure via device_db
 _TIMEOUT = 5
 
+#: updates held by `_Accessor.amonitor` before the oldest is dropped
+_AMONITOR_MAXSIZE = 10
+
+_ca_init_lock = threading.Lock()
+
+_ca_initialized = False
+
+_cfg = None
+
+_pv_pool = None
+
 
 class AccessorPutError(RuntimeError):
     """This accessor is not writable"""
@@ -35,6 +52,7 @@ class Device:
     """
 
     def __init__(self, device_name):
+        _ca_init()
         self.device_name = device_name
         self.meta = slicops.device_db.meta_for_device(device_name)
         self._destroyed = False
@@ -55,6 +73,76 @@ class Device:
             accessor_name, lambda: _Accessor(self, accessor_name)
         )[accessor_name]
 
+    async def aget(self, accessor_name):
+        """Read from accessor without blocking the event loop
+
+        Args:
+            accessor_name (str):
+        Returns:
+            object: the value from the control system converted to a Python type
+        """
+        return await self.accessor(accessor_name).aget()
+
+    def amonitor(self, accessor_name, maxsize=_AMONITOR_MAXSIZE):
+        """Async iterator over updates to accessor
+
+        See `_Accessor.amonitor`.
+
+        Args:
+            accessor_name (str): control system independent name
+            maxsize (int): updates held before dropping the oldest [_AMONITOR_MAXSIZE]
+        Returns:
+            async_generator: yields same `PKDict` as `_Accessor.monitor`
+        """
+        return self.accessor(accessor_name).amonitor(maxsize=maxsize)
+
+    async def aput(self, accessor_name, value):
+        """Set accessor to value without blocking the event loop
+
+        Args:
+            accessor_name (str): control system independent name
+            value (object): Value to write to control system
+        """
+        return await self.accessor(accessor_name).aput(value)
+
+    def cache_stats(self):
+        """Value cache hits and misses of accessors used so far
+
+        Returns:
+            PKDict: accessor_name to PKDict(hits, misses)
+        """
+        return PKDict({k: v.cache_stats() for k, v in self._accessor.items()})
+
+    def health(self):
+        """Connection state and update rates of accessors used so far
+
+        Returns:
+            PKDict: accessor_name to `_Accessor.health`
+        """
+        return PKDict({k: v.health() for k, v in self._accessor.items()})
+
+    def connect(self, accessor_names=None, timeout=_TIMEOUT):
+        """Connect to several accessors at once
+
+        PVs are created together and waited on with a single deadline
+        so connecting costs one connection time instead of one per
+        accessor. If image is included, so are n_row and n_col, and the
+        image shape is resolved once they are connected.
+
+        Args:
+            accessor_names (iterable): control system independent names [all]
+            timeout (float): seconds to wait for all connections [_TIMEOUT]
+        """
+        n = list(accessor_names or self.meta.accessor.keys())
+        if "image" in n:
+            n.extend(x for x in ("n_row", "n_col") if x not in n)
+        a = [self.accessor(x) for x in n]
+        for x, y in zip(a, _connect_many(a, time.monotonic() + timeout)):
+            if y is None:
+                raise DeviceError(f"unable to connect {x}")
+        if "image" in n:
+            self.accessor("image")._image_shape_init()
+
     def destroy(self):
         """Disconnect from accessors and remove state about device"""
         if self._destroyed:
@@ -98,6 +186,114 @@ class Device:
         return f"<Device {self.device_name}>"
 
 
+def get_many(items, timeout=_TIMEOUT):
+    """Read several accessors with one round trip
+
+    Like pyepics ``caget_many``: all PVs are connected together, every
+    get is issued, and then the replies are collected, all within a
+    single deadline. An image whose shape is not known yet has its
+    n_row and n_col read in the same batch.
+
+    Args:
+        items (iterable): (`Device`, accessor_name) pairs
+        timeout (float): seconds to connect and read all items [_TIMEOUT]
+    Returns:
+        list: per item, ``PKDict(value=...)`` or ``PKDict(error=str)``;
+            ``timeout=True`` is also set if the item timed out
+    """
+
+    def _get(accessor, pv):
+        if pv is None:
+            return PKDict(error=f"unable to connect {accessor}", timeout=True)
+        if (
+            v := epics.ca.get_complete(pv.chid, timeout=max(0.0, d - time.monotonic()))
+        ) is None:
+            return PKDict(error=f"unable to get {accessor}", timeout=True)
+        return PKDict(raw=v)
+
+    def _shape(accessor):
+        if accessor.accessor_name != "image" or accessor._image_shape is not None:
+            return ()
+        return tuple(accessor.device.accessor(n) for n in ("n_row", "n_col"))
+
+    def _value(accessor, shape):
+        if shape:
+            for x in shape:
+                if "error" in (y := v[x]):
+                    return y
+            accessor._image_shape_init(tuple(x._fixup_value(v[x].raw) for x in shape))
+        if "error" in (rv := v[accessor]):
+            return rv
+        if (rv := accessor._fixup_value(rv.raw)) is None:
+            return PKDict(error=f"image does not match shape {accessor}")
+        return PKDict(value=rv)
+
+    a = [d.accessor(n) for d, n in items]
+    s = [_shape(x) for x in a]
+    # Accessors are unique per device so duplicates are read once
+    b = list(dict.fromkeys(a + [y for x in s for y in x]))
+    d = time.monotonic() + timeout
+    p = _connect_many(b, d)
+    for x in p:
+        if x is not None:
+            epics.ca.get(x.chid, wait=False)
+    epics.ca.poll()
+    v = {}
+    for x, y in zip(b, p):
+        try:
+            v[x] = _get(x, y)
+        except Exception as e:
+            pkdlog("error={} {} stack={}", e, x, pkdexc())
+            v[x] = PKDict(error=str(e))
+    rv = []
+    for x, y in zip(a, s):
+        try:
+            rv.append(_value(x, y))
+        except Exception as e:
+            pkdlog("error={} {} stack={}", e, x, pkdexc())
+            rv.append(PKDict(error=str(e)))
+    return rv
+
+
+def put_many(items, timeout=_TIMEOUT):
+    """Write several accessors with one round trip
+
+    Like pyepics ``caput_many`` without waiting for completion. All
+    PVs are connected within a single deadline, and then each put is
+    sent.
+
+    Args:
+        items (iterable): (`Device`, accessor_name, value) triples
+        timeout (float): seconds to connect all items [_TIMEOUT]
+    Returns:
+        list: per item, empty ``PKDict`` on success or ``PKDict(error=str)``;
+            ``timeout=True`` is also set if the item did not connect
+    """
+    a = []
+    rv = []
+    v = []
+    for d, n, x in items:
+        a.append(d.accessor(n))
+        try:
+            v.append(a[-1]._put_value(x))
+            rv.append(PKDict())
+        except AccessorPutError as e:
+            v.append(None)
+            rv.append(PKDict(error=str(e)))
+    for x, y, z, r in zip(a, _connect_many(a, time.monotonic() + timeout), v, rv):
+        if r:
+            continue
+        if y is None:
+            r.pkupdate(error=f"unable to connect {x}", timeout=True)
+            continue
+        x._cache_clear()
+        if (e := y.put(z)) != 1:
+            r.error = f"put error={e} value={z} {x}"
+        elif not y.connected:
+            r.error = f"disconnected {x}"
+    return rv
+
+
 class _Accessor:
     """Container for a control system interface (CSI): value, metadata, and dynamic state
 
@@ -115,9 +311,79 @@ class _Accessor:
         self._lock = threading.Lock()
         self._initialized = threading.Event()
         self._initializing = False
+        self._image_shape = None
+        self._early_value = None
+        self._cache = None
+        self._cache_stats = PKDict(hits=0, misses=0)
+        self._health = PKDict(connected=False, disconnects=0, reconnects=0, updates=0)
+        self._update_times = collections.deque(maxlen=_cfg.health_rate_window)
         # Defer initialization
         self._cs = None
 
+    async def aget(self):
+        """Read from control system without blocking the event loop
+
+        pyepics get blocks, so the read runs in the loop's default
+        executor, which is shared by all sessions.
+
+        Returns:
+            object: the value from the accessor converted to a Python type
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.get)
+
+    async def amonitor(self, maxsize=_AMONITOR_MAXSIZE):
+        """Async iterator version of `monitor`
+
+        Updates are passed from pyepics threads to the running event
+        loop. If the consumer falls behind, the oldest updates are
+        dropped so the latest value is always delivered. Monitoring
+        stops when the iterator is closed.
+
+        Args:
+            maxsize (int): updates held before dropping the oldest [_AMONITOR_MAXSIZE]
+        Yields:
+            PKDict: same as the argument to the `monitor` callback
+        """
+
+        def _callback(change):
+            try:
+                l.call_soon_threadsafe(_put, change)
+            except RuntimeError:
+                # Event loop closed
+                pass
+
+        def _put(change):
+            if q.full():
+                q.get_nowait()
+            q.put_nowait(change)
+
+        l = asyncio.get_running_loop()
+        q = asyncio.Queue(maxsize=maxsize)
+        # monitor may connect (and image gets its shape), which blocks
+        await l.run_in_executor(None, self.monitor, _callback)
+        try:
+            while True:
+                yield await q.get()
+        finally:
+            self.monitor_stop()
+
+    async def aput(self, value):
+        """Set accessor to value without blocking the event loop
+
+        Args:
+            value (object): Value to write to control system
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.put, value)
+
+    def cache_stats(self):
+        """Number of gets served from and not from the value cache
+
+        Returns:
+            PKDict: hits and misses
+        """
+        with self._lock:
+            return self._cache_stats.copy()
+
     def destroy(self):
         """Stop all monitoring and disconnect from accessor"""
         if self._destroyed:
@@ -128,28 +394,49 @@ class _Accessor:
             self._destroyed = True
             self._initializing = False
             self._callback = None
-            if (p := self._cs) is None:
+            if self._cs is None:
                 return
             self._cs = None
             self._initialized.set()
-        try:
-            # Clears all callbacks
-            p.disconnect()
-        except Exception as e:
-            pkdlog("error={} {} stack={}", e, self, pkdexc())
+        _pv_pool.release(self)
 
     def get(self):
         """Read from control system
 
+        Monitored values are served from the last update. Other values
+        are served from the last get if it is within ``meta.max_age_secs``.
+
         Returns:
             object: the value from the accessor converted to a Python type
         """
         p = self.__cs()
-        if (rv := p.get(timeout=_TIMEOUT)) is None:
-            raise DeviceError(f"unable to get {self}")
-        if not p.connected:
-            raise DeviceError(f"disconnected {self}")
-        return self._fixup_value(rv)
+        if (rv := self.__cache_get(p)) is None:
+            if (rv := p.get(timeout=_TIMEOUT)) is None:
+                raise DeviceError(f"unable to get {self}")
+            if not p.connected:
+                raise DeviceError(f"disconnected {self}")
+            self.__cache_set(rv, False)
+        if (rv := self._fixup_value(rv)) is None:
+            raise DeviceError(f"image does not match shape={self._image_shape} {self}")
+        return rv
+
+    def health(self):
+        """Connection state and update rate
+
+        Returns:
+            PKDict: connected, disconnects, reconnects (PV recreated),
+                updates, update_rate (per second over recent updates),
+                and last_update_secs (age of last update or None)
+        """
+        with self._lock:
+            rv = self._health.copy()
+            u = tuple(self._update_times)
+        return rv.pkupdate(
+            update_rate=(
+                (len(u) - 1) / (u[-1] - u[0]) if len(u) > 1 and u[-1] > u[0] else 0.0
+            ),
+            last_update_secs=time.monotonic() - u[-1] if u else None,
+        )
 
     def monitor(self, callback):
         """Monitor accessor and call callback with updates and connection changes
@@ -159,6 +446,8 @@ class _Accessor:
                 error occured in the values from the callback (unlikely)
             value : object
                 control system reported this change
+            received : float
+                `slicops.latency.stamp` when value arrived (with value)
             connected : bool
                 connection state changed: True if connected
 
@@ -169,9 +458,13 @@ class _Accessor:
             self._assert_not_destroyed()
             if self._callback:
                 raise AssertionError("may only call monitor once")
-            if self._cs or self._initializing:
-                raise AssertionError("monitor must be called before get/put")
+            if self._initializing and not self._cs:
+                raise AssertionError("monitor called while connecting")
             self._callback = callback
+            c = self._cs is not None
+        if c:
+            # Connected by get/put or `Device.connect`
+            _pv_pool.monitor(self)
         self.__cs()
 
     def monitor_stop(self):
@@ -187,16 +480,8 @@ class _Accessor:
         Args:
             value (object): Value to write to control system
         """
-        if not self.meta.writable:
-            raise AccessorPutError(f"read-only {self}")
-        if self.meta.py_type == bool:
-            v = bool(value)
-        elif self.meta.py_type == int:
-            v = int(value)
-        elif self.meta.py_type == float:
-            v = float(value)
-        else:
-            raise AccessorPutError(f"unhandled py_type={self.meta.py_type} {self}")
+        v = self._put_value(value)
+        self._cache_clear()
         # ECA_NORMAL == 0 and None is normal, too, apparently
         p = self.__cs()
         if (e := p.put(v)) != 1:
@@ -204,13 +489,37 @@ class _Accessor:
         if not p.connected:
             raise DeviceError(f"disconnected {self}")
 
+    def _put_value(self, value):
+        if not self.meta.writable:
+            raise AccessorPutError(f"read-only {self}")
+        if self.meta.py_type == bool:
+            return bool(value)
+        if self.meta.py_type == int:
+            return int(value)
+        if self.meta.py_type == float:
+            return float(value)
+        raise AccessorPutError(f"unhandled py_type={self.meta.py_type} {self}")
+
     def _assert_not_destroyed(self):
         if self._destroyed:
             raise AssertionError(f"destroyed {self}")
 
     def _fixup_value(self, raw):
         def _reshape(image):
-            return image.reshape(self._image_shape)
+            # One read so rows and cols are from the same update
+            s = self._image_shape
+            if image.ndim > 1:
+                if image.shape != s:
+                    return None
+                rv = image
+            elif image.size != s[0] * s[1]:
+                # Size PVs and image arrive separately when the ROI changes
+                return None
+            else:
+                rv = image.reshape(s)
+            # Shared, not copied, from here to the fit and the browser
+            rv.flags.writeable = False
+            return rv
 
         if self.meta.py_type == bool:
             return bool(raw)
@@ -219,6 +528,12 @@ class _Accessor:
         return raw
 
     def _on_connection(self, **kwargs):
+        with self._lock:
+            self._cache = None
+            c = bool(kwargs.get("conn"))
+            if self._health.connected and not c:
+                self._health.disconnects += 1
+            self._health.connected = c
         try:
             if "conn" not in kwargs:
                 # This shouldn't happen
@@ -231,20 +546,50 @@ class _Accessor:
             raise
 
     def _on_value(self, **kwargs):
+        t = slicops.latency.stamp()
+        if (v := kwargs.get("value")) is not None:
+            self.__cache_set(v, True)
+        if self._callback is None:
+            # Another accessor is monitoring the shared PV
+            return
         try:
             if (v := kwargs.get("value")) is None:
                 pkdlog("missing 'value' in kwargs={} {}", kwargs, self)
                 self._run_callback(error="missing value or None")
             else:
-                if self.meta.accessor_name == "image" and not len(v):
-                    pkdlog("empty image received {}", self)
+                if self.meta.accessor_name == "image":
+                    if not len(v):
+                        pkdlog("empty image received {}", self)
+                        return
+                    with self._lock:
+                        if self._image_shape is None:
+                            # Delivered by _image_shape_init
+                            self._early_value = kwargs
+                            return
+                if (v := self._fixup_value(v)) is None:
+                    pkdlog(
+                        "dropping image size={} shape={} {}",
+                        len(kwargs["value"]),
+                        self._image_shape,
+                        self,
+                    )
                     return
-                self._run_callback(value=self._fixup_value(v))
+                self._run_callback(value=v, received=t)
+                slicops.latency.since("receive", t)
         except Exception as e:
             pkdlog("error={} {} stack={}", e, self, pkdexc())
             raise
 
-    def __cs(self):
+    def _cache_clear(self):
+        with self._lock:
+            self._cache = None
+
+    def _connect(self):
+        """Get PV without waiting for it to connect
+
+        Returns:
+            epics.PV: shared PV, possibly not connected
+        """
         with self._lock:
             self._assert_not_destroyed()
             if self._cs:
@@ -253,25 +598,84 @@ class _Accessor:
                 self._initializing = True
         if i:
             self._initialized.wait(timeout=_TIMEOUT)
-        else:
-            k = (
-                PKDict(callback=self._on_value, auto_monitor=True)
-                if self._callback
-                else PKDict()
-            )
-            if self.accessor_name == "image":
-                # TODO(robnagler) this has to be done here, because you can't get accessor
-                # from within a monitor callback.
-                # TODO(robnagler) need a better way of dealing with this
-                self._image_shape = (self.device.get("n_row"), self.device.get("n_col"))
-            self._cs = epics.PV(
-                self.meta.csi_name,
-                connection_callback=self._on_connection,
-                connection_timeout=_TIMEOUT,
-                **k,
-            )
+            if (rv := self._cs) is None:
+                self._assert_not_destroyed()
+                raise DeviceError(f"unable to connect {self}")
+            return rv
+        # Not under the lock, because the pool calls back into the accessor
+        p = _pv_pool.acquire(self, monitor=bool(self._callback))
+        with self._lock:
+            if not (d := self._destroyed):
+                self._cs = p
             self._initialized.set()
-        return self._cs
+        if d:
+            # destroy did not release, because _cs was None
+            _pv_pool.release(self)
+            self._assert_not_destroyed()
+        return p
+
+    def _image_shape_init(self, shape=None):
+        # TODO(robnagler) this has to be done outside of callbacks, because you
+        # can't get accessor from within a monitor callback.
+        s = shape or (self.device.get("n_row"), self.device.get("n_col"))
+        with self._lock:
+            if self._image_shape is not None:
+                return
+            self._image_shape = s
+            v = self._early_value
+            self._early_value = None
+        # ROI and binning change the shape while acquiring
+        for i, n in enumerate(("n_row", "n_col")):
+            self.device.accessor(n).monitor(functools.partial(self._on_image_size, i))
+        if v is not None:
+            self._on_value(**v)
+
+    def _on_image_size(self, axis, change):
+        if (v := change.get("value")) is None:
+            return
+        with self._lock:
+            s = list(self._image_shape)
+            s[axis] = int(v)
+            if (s := tuple(s)) == self._image_shape:
+                return
+            pkdlog("image shape={} was={} {}", s, self._image_shape, self)
+            # Readers see the old or new tuple, never a partial update
+            self._image_shape = s
+
+    def __cache_get(self, pv):
+        with self._lock:
+            if (
+                (c := self._cache)
+                and pv.connected
+                and (
+                    (c.monitored and pv.auto_monitor)
+                    or time.monotonic() - c.time <= self.meta.max_age_secs
+                )
+            ):
+                self._cache_stats.hits += 1
+                return c.value
+            self._cache_stats.misses += 1
+            return None
+
+    def __cache_set(self, value, monitored):
+        t = time.monotonic()
+        with self._lock:
+            self._cache = PKDict(value=value, monitored=monitored, time=t)
+            if monitored:
+                self._health.updates += 1
+                self._update_times.append(t)
+
+    def _on_reconnect(self, pv):
+        with self._lock:
+            self._health.reconnects += 1
+            if self._cs is not None:
+                self._cs = pv
+
+    def __cs(self):
+        rv = self._connect()
+        if self.accessor_name == "image" and self._image_shape is None:
+            self._image_shape_init()
+        return rv
 
     def __repr__(self):
         return f"<_Accessor {self.device.device_name}.{self.accessor_name} {self.meta.csi_name}>"
@@ -282,3 +686,297 @@ class _Accessor:
             c = self._callback
         if c:
             c(k)
+
+
+def _connect_many(accessors, deadline):
+    """Connect accessors together
+
+    Args:
+        accessors (list): `_Accessor` objects
+        deadline (float): `time.monotonic` by which all must be connected
+    Returns:
+        list: connected `epics.PV` or None, per accessor
+    """
+
+    def _connect(accessor):
+        try:
+            return accessor._connect()
+        except DeviceError:
+            # Another thread is connecting and it timed out
+            return None
+
+    p = [_connect(a) for a in accessors]
+    return [
+        (
+            x
+            if x is not None
+            and x.wait_for_connection(timeout=max(0.0, deadline - time.monotonic()))
+            else None
+        )
+        for x in p
+    ]
+
+
+def _ca_init():
+    """pyepics initializes libca on first use, which is not thread safe
+
+    Several devices may connect in their own threads at once, e.g. with
+    `slicops.sliclet.multi_screen`.
+    """
+    global _ca_initialized
+
+    with _ca_init_lock:
+        if _ca_initialized:
+            return
+        epics.ca.use_initial_context()
+        _ca_initialized = True
+
+
+class _PVPool:
+    """Process-wide `epics.PV` objects shared by accessors with the same csi_name
+
+    Accessors are reference counted. A PV is monitored once, and
+    updates and connection changes fan out to all of its
+    accessors. When the last accessor releases a PV, it is
+    disconnected after `_cfg.pv_release_secs` unless it is acquired
+    again. This avoids reconnect storms when users switch between
+    cameras and lets upstream checks reuse channels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pvs = PKDict()
+
+    def acquire(self, accessor, monitor):
+        """Get shared PV and subscribe accessor to its callbacks
+
+        If the PV is already connected, the accessor is called
+        with the connection state and (if monitor) the last value.
+
+        Args:
+            accessor (_Accessor): subscriber
+            monitor (bool): whether accessor needs value updates
+        Returns:
+            epics.PV: shared PV
+        """
+        with self._lock:
+            if rv := self._pvs.get(accessor.meta.csi_name):
+                if rv.release_timer:
+                    rv.release_timer.cancel()
+                    rv.release_timer = None
+            else:
+                rv = self._pvs[accessor.meta.csi_name] = _SharedPV(
+                    accessor.meta.csi_name, monitor
+                )
+            # Keeps rv from expiring until accessor is added
+            rv.acquiring += 1
+            m = monitor and not rv.monitoring
+            rv.monitoring = rv.monitoring or monitor
+        # Callbacks may use the pool so replay outside the pool lock
+        with rv.lock:
+            rv.accessors += (accessor,)
+            rv.replay(accessor, monitor)
+        with self._lock:
+            rv.acquiring -= 1
+        if m:
+            rv.pv.auto_monitor = True
+        return rv.pv
+
+    def monitor(self, accessor):
+        """Start monitoring for an accessor acquired without monitor
+
+        Args:
+            accessor (_Accessor): subscriber
+        """
+        with self._lock:
+            rv = self._pvs[accessor.meta.csi_name]
+            m = not rv.monitoring
+            rv.monitoring = True
+        with rv.lock:
+            rv.replay(accessor, True)
+        if m:
+            rv.pv.auto_monitor = True
+
+    def release(self, accessor):
+        """Unsubscribe accessor and disconnect PV if unused after a grace period
+
+        Args:
+            accessor (_Accessor): subscriber
+        """
+        with self._lock:
+            if not (p := self._pvs.get(accessor.meta.csi_name)):
+                return
+            with p.lock:
+                p.accessors = tuple(a for a in p.accessors if a is not accessor)
+            if p.in_use():
+                return
+            if _cfg.pv_release_secs > 0:
+                p.release_timer = threading.Timer(
+                    _cfg.pv_release_secs, self._expire, (p,)
+                )
+                p.release_timer.daemon = True
+                p.release_timer.start()
+                return
+            del self._pvs[p.csi_name]
+        p.disconnect()
+
+    def _expire(self, shared_pv):
+        with self._lock:
+            if shared_pv.in_use() or self._pvs.get(shared_pv.csi_name) is not shared_pv:
+                return
+            del self._pvs[shared_pv.csi_name]
+        shared_pv.disconnect()
+
+
+class _SharedPV:
+    """State of a PV in `_PVPool`
+
+    If the PV stays disconnected, e.g. after an IOC restart, the
+    `epics.PV` is recreated with exponential backoff between
+    `_cfg.reconnect.min_secs` and `_cfg.reconnect.max_secs`. Accessors
+    keep their callbacks so monitors resume without recreating the
+    `Device`.
+    """
+
+    def __init__(self, csi_name, monitor):
+        self.csi_name = csi_name
+        self.accessors = ()
+        self.acquiring = 0
+        self.connected = False
+        self.last_value = None
+        # Reentrant in case an accessor callback acquires this PV
+        self.lock = threading.RLock()
+        self.monitoring = monitor
+        self.release_timer = None
+        self.reconnect_timer = None
+        self._backoff = _cfg.reconnect.min_secs
+        self._disconnected = False
+        # Callbacks from replaced PVs are ignored
+        self._generation = 0
+        self.pv = self._pv()
+
+    def disconnect(self):
+        with self.lock:
+            self._disconnected = True
+            self._generation += 1
+            self._reconnect_cancel()
+            p = self.pv
+        try:
+            # Clears all callbacks
+            p.disconnect()
+        except Exception as e:
+            pkdlog("error={} pv={} stack={}", e, self.csi_name, pkdexc())
+
+    def in_use(self):
+        return bool(self.accessors or self.acquiring)
+
+    def replay(self, accessor, monitor):
+        """Send current state to new subscriber (called with lock held)"""
+        if self.connected:
+            accessor._on_connection(conn=True)
+        if monitor and self.last_value is not None:
+            accessor._on_value(**self.last_value)
+
+    def _on_connection(self, generation, **kwargs):
+        with self.lock:
+            if generation != self._generation:
+                return
+            self.connected = bool(kwargs.get("conn"))
+            if self.connected:
+                self._reconnect_cancel()
+                self._backoff = _cfg.reconnect.min_secs
+            elif self.reconnect_timer is None:
+                self._reconnect_schedule()
+            self._fan_out("_on_connection", kwargs)
+
+    def _on_value(self, generation, **kwargs):
+        with self.lock:
+            if generation != self._generation:
+                return
+            self.last_value = PKDict(value=kwargs.get("value"))
+            self._fan_out("_on_value", kwargs)
+
+    def _fan_out(self, method, kwargs):
+        for a in self.accessors:
+            try:
+                getattr(a, method)(**kwargs)
+            except Exception:
+                # _Accessor logs the error
+                pass
+
+    def _pv(self):
+        g = self._generation
+        k = (
+            PKDict(callback=functools.partial(self._on_value, g), auto_monitor=True)
+            if self.monitoring
+            else PKDict()
+        )
+        rv = epics.PV(
+            self.csi_name,
+            connection_callback=functools.partial(self._on_connection, g),
+            connection_timeout=_TIMEOUT,
+            **k,
+        )
+        if not self.monitoring:
+            # auto_monitor may be turned on later by `_PVPool.acquire`
+            rv.add_callback(functools.partial(self._on_value, g))
+        return rv
+
+    def _reconnect(self):
+        with self.lock:
+            self.reconnect_timer = None
+            if self.connected or self._disconnected or not self.in_use():
+                return
+            pkdlog("pv={} still disconnected, recreating", self.csi_name)
+            self._generation += 1
+            try:
+                self.pv.disconnect()
+            except Exception as e:
+                pkdlog("error={} pv={} stack={}", e, self.csi_name, pkdexc())
+            self.pv = self._pv()
+            for a in self.accessors:
+                a._on_reconnect(self.pv)
+            # In case the new PV does not connect either
+            self._reconnect_schedule()
+
+    def _reconnect_cancel(self):
+        if self.reconnect_timer:
+            self.reconnect_timer.cancel()
+            self.reconnect_timer = None
+
+    def _reconnect_schedule(self):
+        if _cfg.reconnect.min_secs <= 0 or self._disconnected:
+            return
+        self.reconnect_timer = threading.Timer(self._backoff, self._reconnect)
+        self.reconnect_timer.daemon = True
+        self.reconnect_timer.start()
+        self._backoff = min(self._backoff * 2, _cfg.reconnect.max_secs)
+
+
+def _init():
+    global _cfg, _pv_pool
+
+    _cfg = pykern.pkconfig.init(
+        health_rate_window=(
+            20,
+            pykern.pkconfig.parse_positive_int,
+            "number of recent monitor updates used to compute update_rate",
+        ),
+        pv_release_secs=(
+            10,
+            pykern.pkconfig.parse_seconds,
+            "how long unused PVs stay connected (0 disconnects immediately)",
+        ),
+        reconnect=PKDict(
+            min_secs=(
+                5.0,
+                float,
+                "first delay before recreating a disconnected PV (0 never recreates)",
+            ),
+            max_secs=(60.0, float, "maximum delay between recreating PVs"),
+        ),
+    )
+    _pv_pool = _PVPool()
+
+
+_init()
@@ -14,6 +14,9 @@ import pykern.pkconfig
 import queue
 import slicops.device
 import slicops.device_db
+import slicops.latency
+import threading
+import time
 
 # TODO(robnagler) these should be reused for both cases
 _MOVE_TARGET_IN = PKDict({False: 0, True: 1})
@@ -22,6 +25,9 @@ _BLOCKING_MSG = "upstream target is {}"
 _TIMEOUT_MSG = "upstream target status accessor timed out"
 _ERROR_PREFIX_MSG = "upstream target error: "
 
+#: accessors which `_Worker` monitors
+_MONITORED_ACCESSORS = frozenset(("acquire", "image", "target_status"))
+
 
 class Screen(slicops.device.Device):
     """Augment `Device` with screen specific operations"""
@@ -38,6 +44,14 @@ class Screen(slicops.device.Device):
         self.__worker.destroy()
         super().destroy()
 
+    def monitor_drops(self):
+        """Monitor updates replaced by a newer update before they were handled
+
+        Returns:
+            PKDict: accessor_name to count
+        """
+        return self.__worker.drops()
+
     def move_target(self, want_in):
         """Insert or remove the target
 
@@ -63,7 +77,23 @@ class EventHandler:
         pass
 
     @abc.abstractmethod
-    def on_screen_device_update(self, accessor_name, value):
+    def on_screen_device_update(self, accessor_name, value, received=None):
+        """Called with a new value from a monitored accessor
+
+        Args:
+            accessor_name (str): which accessor
+            value (object): converted value
+            received (float): `slicops.latency.stamp` of the monitor update
+        """
+        pass
+
+    def on_screen_device_health(self, accessor_name, health):
+        """Called when an accessor connects or disconnects
+
+        Args:
+            accessor_name (str): which accessor
+            health (PKDict): see `slicops.device._Accessor.health`
+        """
         pass
 
 
@@ -114,6 +144,10 @@ class _FSM:
                 return PKDict(target_status=None, move_target_arg=None)
             return
         if "connected" in arg:
+            self.worker.action(
+                "call_handler",
+                PKDict(accessor_name=n, health=arg.accessor.health()),
+            )
             return
         if n == "image":
             v = arg.value
@@ -132,7 +166,10 @@ class _FSM:
                 rv.move_target_arg = None
         else:
             raise AssertionError(f"unsupported accessor={n} {self}")
-        self.worker.action("call_handler", PKDict(accessor_name=n, value=v))
+        self.worker.action(
+            "call_handler",
+            PKDict(accessor_name=n, value=v, received=arg.get("received")),
+        )
         return rv
 
     def _event_move_target(
@@ -227,7 +264,10 @@ class TargetStatus(enum.Enum):
 
 
 class _Upstream(pykern.pkasyncio.ActionLoop):
-    """Action loop to check targets of upstream screens"""
+    """Action loop to check targets of upstream screens
+
+    All target statuses are read with one `slicops.device.get_many`.
+    """
 
     def __init__(self, worker):
         def _names():
@@ -242,25 +282,24 @@ class _Upstream(pykern.pkasyncio.ActionLoop):
             self.__done()
             self._destroy()
             return
-        self._loop_timeout_secs = _cfg.upstream_timeout_secs
         super().__init__()
 
-    def action_handle_target_status(self, arg):
-        n = arg.accessor.device.device_name
-        self.__devices.pkdel(n).destroy()
-        if e := arg.get("error"):
-            pkdlog("device={} error={}", n, e)
-            self.__problems[n] = f"{_ERROR_PREFIX_MSG}{e}"
-        elif arg.value != TargetStatus.OUT.value:
-            s = TargetStatus(arg.value)
-            self.__problems[n] = _BLOCKING_MSG.format(s.name)
-        if not self.__devices:
-            return self.__done()
-        return None
-
-    def action_loop_timeout(self):
-        for n in self.__devices:
-            self.__problems[n] = _TIMEOUT_MSG
+    def action_check_target_status(self, arg):
+        for n, r in zip(
+            self.__devices.keys(),
+            slicops.device.get_many(
+                ((d, "target_status") for d in self.__devices.values()),
+                timeout=_cfg.upstream_timeout_secs,
+            ),
+        ):
+            if r.get("timeout"):
+                self.__problems[n] = _TIMEOUT_MSG
+            elif e := r.get("error"):
+                pkdlog("device={} error={}", n, e)
+                self.__problems[n] = f"{_ERROR_PREFIX_MSG}{e}"
+            elif r.value != TargetStatus.OUT.value:
+                s = TargetStatus(r.value)
+                self.__problems[n] = _BLOCKING_MSG.format(s.name)
         return self.__done()
 
     def _destroy(self):
@@ -272,14 +311,8 @@ class _Upstream(pykern.pkasyncio.ActionLoop):
         self.__worker.action("upstream_status", PKDict(problems=self.__problems))
         return self._LOOP_END
 
-    def __handle_target_status(self, kwargs):
-        if "connected" in kwargs:
-            return
-        self.action("handle_target_status", kwargs)
-
     def _start(self, *args, **kwargs):
-        for d in self.__devices.values():
-            d.accessor("target_status").monitor(self.__handle_target_status)
+        self.action("check_target_status", None)
         super()._start(*args, **kwargs)
 
     def _repr(self):
@@ -293,12 +326,26 @@ class _Worker(pykern.pkasyncio.ActionLoop):
     from device are translated to actions to avoid locking in
     callback. Similarly, when Screen requests to move target, this is
     a queued action as well.
+
+    Updates to accessors in `_cfg.coalesce_accessors` (image) are
+    coalesced: at most one is queued and a newer value replaces it.
+    Updates arriving faster than `_cfg.max_publish_rate` are held
+    (latest wins) and queued by a timer when the interval ends. This
+    keeps the queue bounded when the camera is faster than the fits
+    and the UI without losing the last value of a burst.
     """
 
     def __init__(self, beam_path, handler, device):
         self.beam_path = beam_path
         self.device = device
         self.__handler = handler
+        self.__coalesce_lock = threading.Lock()
+        self.__drops = PKDict()
+        self.__flush_timers = PKDict()
+        self.__pending = PKDict()
+        self.__published = PKDict()
+        self.__queued = 0
+        self.__queued_lock = threading.Lock()
         self.__upstream = None
         self.__status = None
         # self.monitors = pkdict...
@@ -312,11 +359,12 @@ class _Worker(pykern.pkasyncio.ActionLoop):
         # exit
 
     def action_call_handler(self, arg):
-        m = (
-            self.__handler.on_screen_device_error
-            if isinstance(arg, Exception)
-            else self.__handler.on_screen_device_update
-        )
+        if isinstance(arg, Exception):
+            m = self.__handler.on_screen_device_error
+        elif "health" in arg:
+            m = self.__handler.on_screen_device_health
+        else:
+            m = self.__handler.on_screen_device_update
         # Denormalized state so no need for lock during call
         if isinstance(arg, dict):
             return lambda: m(**arg)
@@ -328,8 +376,25 @@ class _Worker(pykern.pkasyncio.ActionLoop):
             self.__upstream = _Upstream(self)
         return None
 
+    def action_handle_coalesced(self, accessor_name):
+        with self.__coalesce_lock:
+            self.__flush_timers.pkdel(accessor_name)
+            c = self.__pending.pkdel(accessor_name)
+            self.__published[accessor_name] = time.monotonic()
+        return self.action_handle_monitor(c)
+
+    def action(self, method, arg):
+        with self.__queued_lock:
+            self.__queued += 1
+            d = self.__queued
+        slicops.latency.queue_depth("screen_worker", d)
+        super().action(method, arg)
+
     def action_handle_monitor(self, arg):
+        slicops.latency.since("worker_queue", arg.pkdel("queued"))
+        t = slicops.latency.stamp()
         self.__fsm.event("handle_monitor", arg)
+        slicops.latency.since("fsm", t)
         return None
 
     def action_move_target(self, arg):
@@ -347,6 +412,10 @@ class _Worker(pykern.pkasyncio.ActionLoop):
         self.__upstream = None
         return None
 
+    def drops(self):
+        with self.__coalesce_lock:
+            return self.__drops.copy()
+
     def req_action(self, method, arg):
         """Called by DeviceScreen which has separate life cycle"""
         # __fsm.is_ready
@@ -358,6 +427,17 @@ class _Worker(pykern.pkasyncio.ActionLoop):
         if self.__upstream:
             (u, self.__upstream) = (self.__upstream, None)
             u.destroy()
+        with self.__coalesce_lock:
+            for t in self.__flush_timers.values():
+                t.cancel()
+            self.__flush_timers.clear()
+        if d := self.drops():
+            pkdlog("{} dropped={}", self, d)
+
+    def _dispatch_action(self, method, arg):
+        with self.__queued_lock:
+            self.__queued -= 1
+        return super()._dispatch_action(method, arg)
 
     def _handle_exception(self, exc):
         self.__handler.on_screen_device_error(
@@ -368,11 +448,42 @@ class _Worker(pykern.pkasyncio.ActionLoop):
         )
 
     def __handle_monitor(self, change):
-        self.action("handle_monitor", change)
+        change.queued = slicops.latency.stamp()
+        n = change.accessor.accessor_name
+        if n not in _cfg.coalesce_accessors or "value" not in change:
+            self.action("handle_monitor", change)
+            return
+        with self.__coalesce_lock:
+            if n in self.__pending:
+                # Replace the update which has not been handled yet
+                self.__pending[n] = change
+                self.__drops[n] = self.__drops.get(n, 0) + 1
+                return
+            self.__pending[n] = change
+            if (w := self.__publish_wait(n)) > 0:
+                # Hold the latest update until the interval ends
+                self.__flush_timers[n] = t = threading.Timer(
+                    w, self.action, ("handle_coalesced", n)
+                )
+                t.daemon = True
+                t.start()
+                return
+        self.action("handle_coalesced", n)
+
+    def __publish_wait(self, accessor_name):
+        if _cfg.max_publish_rate <= 0:
+            return 0
+        return (
+            self.__published.get(accessor_name, 0)
+            + 1 / _cfg.max_publish_rate
+            - time.monotonic()
+        )
 
     def _start(self, *args, **kwargs):
-        for a in "acquire", "image":  # self.monitors ...
-            self.device.accessor(a).monitor(self.__handle_monitor)
+        self.device.accessor("acquire").monitor(self.__handle_monitor)
+        # image needs its shape (n_row, n_col) so connect them together
+        self.device.connect(("image",))
+        self.device.accessor("image").monitor(self.__handle_monitor)
         if self.device.has_accessor("target_status"):
             self.device.accessor("target_status").monitor(self.__handle_monitor)
         super()._start(*args, **kwargs)
@@ -381,10 +492,31 @@ class _Worker(pykern.pkasyncio.ActionLoop):
         return f"device={self.device.device_name}"
 
 
+def _cfg_coalesce_accessors(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    rv = tuple(x.strip() for x in value if x.strip())
+    if x := set(rv) - _MONITORED_ACCESSORS:
+        pykern.pkconfig.raise_error(
+            f"unknown accessors={sorted(x)} must be in {sorted(_MONITORED_ACCESSORS)}"
+        )
+    return rv
+
+
 _cfg = pykern.pkconfig.init(
+    coalesce_accessors=(
+        ("image",),
+        _cfg_coalesce_accessors,
+        "comma separated monitored accessors where only the latest queued update is processed",
+    ),
+    max_publish_rate=(
+        0.0,
+        float,
+        "max updates per second processed for coalesce_accessors (0 is unlimited)",
+    ),
     upstream_timeout_secs=(
         15,
         pykern.pkconfig.parse_seconds,
-        "how long to wait for updates from devices",
+        "how long to wait for upstream target statuses",
     ),
 )
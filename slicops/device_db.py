@@ -19,7 +19,7 @@ class DeviceMeta(PKDict):
     """Information about a device
 
     Attributes:
-        accessor (PKDict): name to PKDict(name, csi_name, writable, py_type, ...)
+        accessor (PKDict): name to PKDict(name, csi_name, writable, py_type, max_age_secs, ...)
         beam_area (str): area where device is located
         beam_path (tuple): which beam paths does it go through
         device_type (str): type device, e.g. "PROF"
@@ -78,6 +78,14 @@ def meta_for_device(device_name):
     return rv
 
 
+def prewarm():
+    """Load device meta data so `meta_for_device` is a lookup
+
+    The data is reloaded automatically when the db file changes.
+    """
+    slicops.device_sql_db.prewarm()
+
+
 def upstream_devices(device_type, accessor_name, beam_path, device_name):
     """returns in z order"""
     return slicops.device_sql_db.upstream_devices(
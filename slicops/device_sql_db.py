@@ -8,17 +8,25 @@ Use slicops.device_db for a stable interface.
 
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdlog, pkdp
+import bisect
 import numpy
+import os
 import pykern.pkconfig
 import pykern.pkresource
 import pykern.sql_db
 import slicops.config
 import sqlalchemy
+import threading
 
 _BASE_PATH = "device_db.sqlite3"
 
 _meta = None
 
+#: devices and upstream index, and the db file stat they were read from
+_cache = None
+
+_cache_lock = threading.Lock()
+
 _PY_TYPES = PKDict(
     {
         "bool": bool,
@@ -29,7 +37,10 @@ _PY_TYPES = PKDict(
 )
 
 
+# max_age_secs is how long `slicops.device` may serve a value from
+# its cache so only accessors which change rarely are non-zero
 _ACCESSOR_META_DEFAULT = PKDict(
+    max_age_secs=0,
     py_type="float",
     writable=False,
 )
@@ -38,7 +49,7 @@ _ACCESSOR_META = PKDict(
     acquire=PKDict(py_type="bool", writable=True),
     enabled=PKDict(py_type="int", writable=False),
     image=PKDict(py_type="numpy.ndarray", writable=False),
-    n_bits=PKDict(py_type="int", writable=False),
+    n_bits=PKDict(max_age_secs=60, py_type="int", writable=False),
     n_col=PKDict(py_type="int", writable=False),
     n_row=PKDict(py_type="int", writable=False),
     start_scan=PKDict(py_type="int", writable=True),
@@ -56,18 +67,28 @@ def beam_paths():
 
 
 def device(name):
-    def _py_type(rec):
-        return rec.pkupdate(py_type=_PY_TYPES[rec.py_type])
+    """Device record with its accessors
+
+    Served from an in-memory copy of all devices, which is reloaded
+    when the db file changes.
+
+    Args:
+        name (str): device_name
+    Returns:
+        PKDict: device columns and accessor (accessor_name to PKDict)
+    """
+    if (rv := _cache_get().devices.get(name)) is None:
+        # Raises NoRows
+        with _session() as s:
+            rv = _device_record(s.select_one("device", PKDict(device_name=name)), ())
+    return PKDict(rv).pkupdate(
+        accessor=PKDict({k: v.copy() for k, v in rv.accessor.items()}),
+    )
 
-    with _session() as s:
-        return PKDict(s.select_one("device", PKDict(device_name=name))).pkupdate(
-            accessor=PKDict(
-                {
-                    r.accessor_name: _py_type(PKDict(r))
-                    for r in s.select("device_accessor", PKDict(device_name=name))
-                }
-            ),
-        )
+
+def prewarm():
+    """Load cache so the first `device` and `upstream_devices` calls are fast"""
+    _cache_get()
 
 
 def device_names(device_type, beam_path):
@@ -101,65 +122,102 @@ def recreate(parser):
 
 
 def upstream_devices(device_type, required_accessor, beam_path, end_device):
-    with _session() as s:
-        # select device.device_name from device_meta_float, device where device_meta_name = 'sum_l_meters' and device_meta_value < 33 and device.device_type = 'PROF' and device.device_name = device_meta_float.device_name;
-        c = s.t.device_meta_float.c.device_name
-        _assert_on_beampath(end_device, beam_path, s)
-        return tuple(
-            r.device_name
-            for r in s.select(
-                sqlalchemy.select(c)
-                .select_from(
-                    s.t.device_meta_float.join(
-                        s.t.device,
-                        s.t.device.c.device_name == c,
-                    )
-                    .join(
-                        s.t.beam_path,
-                        s.t.beam_path.c.beam_area == s.t.device.c.beam_area,
-                    )
-                    .join(
-                        s.t.device_accessor,
-                        s.t.device_accessor.c.device_name == c,
-                    )
-                )
-                .where(
-                    s.t.beam_path.c.beam_path == beam_path,
-                    s.t.device_meta_float.c.device_meta_name == "sum_l_meters",
-                    s.t.device_meta_float.c.device_meta_value
-                    < _device_meta(end_device, "sum_l_meters", s),
-                    s.t.device.c.device_type == device_type,
-                    s.t.device_accessor.c.accessor_name == required_accessor,
-                )
-                .order_by(s.t.device_meta_float.c.device_meta_value)
-            )
-        )
-
+    """Devices before end_device on beam_path in z order
+
+    Devices are indexed by sum_l_meters per beam_path, device_type, and
+    required_accessor so the lookup is a bisect.
+
+    Args:
+        device_type (str): e.g. "PROF"
+        required_accessor (str): devices must have this accessor
+        beam_path (str): which beam path
+        end_device (str): devices upstream of this one
+    Returns:
+        tuple: device names
+    """
+    c = _cache_get()
+    if end_device not in c.beam_path_devices.get(beam_path, ()):
+        raise ValueError(f"device={end_device} is not in beam_path={beam_path}")
+    if (z := c.sum_l_meters.get(end_device)) is None:
+        raise ValueError(f"device={end_device} has no sum_l_meters")
+    k = (beam_path, device_type, required_accessor)
+    if (i := c.upstream.get(k)) is None:
+        # Benign race: another thread may build the same index
+        i = c.upstream[k] = _upstream_index(c, *k)
+    return i.names[: bisect.bisect_left(i.sum_l_meters, z)]
+
+
+def _device_record(device, accessors):
+    def _py_type(rec):
+        return rec.pkupdate(py_type=_PY_TYPES[rec.py_type])
 
-def _assert_on_beampath(device, beam_path, select):
-    c = select.t.device.c.device_name
-    v = select.select_one_or_none(
-        sqlalchemy.select(c)
-        .select_from(
-            select.t.device.join(
-                select.t.beam_path,
-                select.t.beam_path.c.beam_area == select.t.device.c.beam_area,
-            )
-        )
-        .where(
-            select.t.device.c.device_name == device,
-            select.t.beam_path.c.beam_path == beam_path,
-        ),
-        None,
+    return PKDict(device).pkupdate(
+        accessor=PKDict({r.accessor_name: _py_type(PKDict(r)) for r in accessors}),
     )
-    if v is None:
-        raise ValueError(f"device={device} is not in beam_path={beam_path}")
 
 
-def _device_meta(device, meta, select):
-    return select.select_one(
-        "device_meta_float", PKDict(device_name=device, device_meta_name=meta)
-    ).device_meta_value
+def _cache_get():
+    global _cache
+
+    def _load(path, stat):
+        a = PKDict()
+        p = PKDict()
+        with _session() as s:
+            for r in s.select("device_accessor"):
+                a.setdefault(r.device_name, []).append(r)
+            for r in s.select("beam_path"):
+                p.setdefault(r.beam_area, []).append(r.beam_path)
+            rv = PKDict(
+                beam_path_devices=PKDict(),
+                devices=PKDict(),
+                path=path,
+                stat=stat,
+                sum_l_meters=PKDict(
+                    {
+                        r.device_name: r.device_meta_value
+                        for r in s.select(
+                            "device_meta_float",
+                            PKDict(device_meta_name="sum_l_meters"),
+                        )
+                    }
+                ),
+                upstream=PKDict(),
+            )
+            for r in s.select("device"):
+                for x in p.get(r.beam_area, ()):
+                    rv.beam_path_devices.setdefault(x, set()).add(r.device_name)
+                # Devices without accessors are not usable
+                if r.device_name in a:
+                    rv.devices[r.device_name] = _device_record(r, a[r.device_name])
+        return rv
+
+    def _stat(path):
+        s = os.stat(path)
+        return (s.st_mtime_ns, s.st_size)
+
+    if (rv := _cache) is not None and rv.stat == _stat(rv.path):
+        return rv
+    with _cache_lock:
+        p = str(_path()) if _cache is None else _cache.path
+        s = _stat(p)
+        if _cache is None or _cache.stat != s:
+            _cache = _load(p, s)
+        return _cache
+
+
+def _upstream_index(cache, beam_path, device_type, required_accessor):
+    d = sorted(
+        (cache.sum_l_meters[n], n)
+        for n in cache.beam_path_devices.get(beam_path, ())
+        if n in cache.sum_l_meters
+        and (r := cache.devices.get(n))
+        and r.device_type == device_type
+        and required_accessor in r.accessor
+    )
+    return PKDict(
+        names=tuple(x[1] for x in d),
+        sum_l_meters=tuple(x[0] for x in d),
+    )
 
 
 class _Inserter:
@@ -184,7 +242,9 @@ class _Inserter:
     def _devices(self, parsed, session):
         def _accessor_meta(accessors):
             for a in accessors:
-                a.pkupdate(_ACCESSOR_META.get(a.accessor_name, _ACCESSOR_META_DEFAULT))
+                a.pkupdate(_ACCESSOR_META_DEFAULT).pkupdate(
+                    _ACCESSOR_META.get(a.accessor_name, PKDict())
+                )
             return accessors
 
         def _insert(table, values):
@@ -226,6 +286,7 @@ def _init():
                 csi_name=s,
                 py_type=s,
                 writable="bool",
+                max_age_secs="float 64",
             ),
             device_meta_float=PKDict(
                 device_name=p + " foreign",
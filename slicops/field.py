@@ -8,11 +8,39 @@ from pykern import pkconfig, pkresource, pkyaml
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
 import copy
+import numpy
 import re
 
 _PROTOTYPES = None
 
 
+def deepcopy(value):
+    """`copy.deepcopy` except read-only ndarrays are shared
+
+    Images are large and are marked read-only by their producers so
+    there is no need to copy them.
+
+    Args:
+        value (object): to copy
+    Returns:
+        object: copy of value
+    """
+
+    def _memo(value, rv):
+        if isinstance(value, numpy.ndarray):
+            if not value.flags.writeable:
+                rv[id(value)] = value
+        elif isinstance(value, dict):
+            for v in value.values():
+                _memo(v, rv)
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                _memo(v, rv)
+        return rv
+
+    return copy.deepcopy(value, _memo(value, {}))
+
+
 def prototypes():
     return _PROTOTYPES
 
@@ -41,6 +69,8 @@ class Base:
     __SIMPLE_TOP_ATTRS = frozenset(("name", "value"))
     __GROUP_ATTRS = frozenset(("constraints", "links", "ui"))
     __TOP_ATTRS = __SIMPLE_TOP_ATTRS.union(__GROUP_ATTRS)
+    # Changes to these require _assert_attrs
+    __CHECKED_ATTRS = frozenset(("constraints", "links", "name"))
     # Others that convert from yaml
     __INVALID_NAMES = frozenset(("true", "false", "null", "none"))
     __VALID_NAME = re.compile(r"^[a-z]\w+$")
@@ -49,7 +79,7 @@ class Base:
         def _copy():
             if prototype is None:
                 return self._defaults()
-            return copy.deepcopy(prototype._attrs)
+            return deepcopy(prototype._attrs)
 
         self._attrs = self.__merge(_copy(), overrides)
         self._assert_attrs()
@@ -57,7 +87,36 @@ class Base:
         self.value_set(self._attrs.value)
 
     def as_dict(self):
-        return PKDict((k, copy.deepcopy(self._attrs[k])) for k in self.__TOP_ATTRS)
+        return PKDict((k, deepcopy(self._attrs[k])) for k in self.__TOP_ATTRS)
+
+    def changes(self, old):
+        """Attributes which differ from old
+
+        Group attrs are compared one by one so only the changed ones
+        are returned. Removed group attrs are None.
+
+        Args:
+            old (Base): previous version of this field
+        Returns:
+            PKDict: changed attrs (copied), which may be empty
+        """
+        rv = PKDict()
+        for k in self.__SIMPLE_TOP_ATTRS:
+            if not _equal(self._attrs[k], old._attrs[k]):
+                rv[k] = deepcopy(self._attrs[k])
+        for k in self.__GROUP_ATTRS:
+            n = self._attrs[k]
+            o = old._attrs[k]
+            c = PKDict(
+                (a, deepcopy(v))
+                for a, v in n.items()
+                if a not in o or not _equal(v, o[a])
+            )
+            for a in o.keys() - n.keys():
+                c[a] = None
+            if c:
+                rv[k] = c
+        return rv
 
     def group_attr(self, group, attr=None):
         if group not in self.__GROUP_ATTRS:
@@ -74,8 +133,27 @@ class Base:
         return rv
 
     def renew(self, overrides):
-        # Updating an instance inherits everything
-        return self.__class__(self, overrides)
+        """Copy of self with overrides applied
+
+        Attrs are copy on write: groups which are not overridden are
+        shared with self so they must not be modified in place. Only
+        ui changes are not validated, and attrs are only checked when
+        constraints, links, or name change.
+
+        Args:
+            overrides (PKDict): top level attrs and groups (consumed)
+        Returns:
+            Base: new instance
+        """
+        k = frozenset(overrides.keys())
+        rv = copy.copy(self)
+        rv._attrs = self.__merge(PKDict(self._attrs), overrides)
+        if k & self.__CHECKED_ATTRS:
+            rv._assert_attrs()
+        elif "value" not in k:
+            return rv
+        rv.value_set(rv._attrs.value)
+        return rv
 
     def value(self):
         return self._attrs.value
@@ -151,12 +229,15 @@ class Base:
 
     def __merge(self, result, overrides):
         def _update(attr, new):
+            # groups may be shared (see renew) so always copy
+            rv = PKDict(attr)
             # ok if empty
             for k, v in new.items():
                 if v is None:
-                    attr.pkdel(k)
+                    rv.pkdel(k)
                 else:
-                    attr[k] = v
+                    rv[k] = v
+            return rv
 
         for t in self.__TOP_ATTRS:
             if t not in overrides:
@@ -167,7 +248,7 @@ class Base:
             elif not isinstance(o, dict):
                 raise ValueError(f"overrides {t} is not a dict type={type(o)}")
             else:
-                _update(result[t], o)
+                result[t] = _update(result[t], o)
         if overrides:
             raise ValueError(
                 f"unexpected top key(s)={sorted(overrides.keys())}; must be {sorted(self.__TOP_ATTRS)}"
@@ -256,6 +337,8 @@ class Dict(Base):
 
 class Enum(Base):
     __INITIAL_CHOICES = object()
+    # constraints.choices which __map was created from
+    __map_choices = None
 
     def _defaults(self, *overrides):
         return super()._defaults(
@@ -271,6 +354,8 @@ class Enum(Base):
         def _choices(constraints):
             # Enum._defaults has no choices
             c = constraints.choices
+            # constraints may be shared with the field this was renewed from
+            self._attrs.constraints = constraints = PKDict(constraints)
             constraints.choices = rv = PKDict(
                 () if c is self.__INITIAL_CHOICES else _convert(tuple(_pairs(c)))
             )
@@ -308,7 +393,11 @@ class Enum(Base):
             return t
 
         super()._assert_attrs()
+        if self._attrs.constraints.choices is self.__map_choices:
+            # renewed without new choices so __map is still valid
+            return
         self.__map = self.__create_map(_choices(self._attrs.constraints))
+        self.__map_choices = self._attrs.constraints.choices
 
     def __create_map(self, choices):
         def _cross_check(labels, values):
@@ -423,6 +512,18 @@ class String(Base):
             return InvalidFieldValue("not string", exc=e)
 
 
+def _equal(new, old):
+    if new is old:
+        return True
+    if type(new) != type(old):
+        return False
+    try:
+        return bool(new == old)
+    except Exception:
+        # ndarrays (possibly nested in a dict) compare elementwise
+        return False
+
+
 def _init():
     global _PROTOTYPES, _PROTOTYPES_LOWER
 
@@ -0,0 +1,147 @@
+"""Latency of monitor updates from the control system to the browser
+
+Stages are timed where they happen and recorded in process-wide
+histograms. A monitor update passes through:
+
+    receive
+        `slicops.device._Accessor` monitor callback (includes coalescing)
+    worker_queue
+        waiting in the `slicops.device.screen` worker's action queue
+    fsm
+        screen state machine handling the update
+    fit
+        `slicops.plot.Analyzer` fitting an image
+    sliclet_lock_wait
+        waiting for `slicops.sliclet.Base.lock_for_update`
+    sliclet_commit
+        committing the ctx transaction
+    event_loop
+        passing the ctx update to the asyncio loop
+    result_put
+        sending the ctx update to the subscription
+
+The whole path, from receive to the ctx update arriving in the
+asyncio loop, is recorded as end_to_end. Only updates which change
+the ctx are included.
+
+Queue depths are sampled when work is queued.
+
+:copyright: Copyright (c) 2026 The Board of Trustees of the Leland Stanford Junior University, through SLAC National Accelerator Laboratory (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All Rights Reserved.
+:license: http://github.com/slaclab/slicops/LICENSE
+"""
+
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdlog, pkdp
+import bisect
+import pykern.pkconfig
+import threading
+import time
+
+#: upper bounds of histogram buckets in seconds; the last bucket is unbounded
+_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+_lock = threading.Lock()
+
+_queues = PKDict()
+
+_stages = PKDict()
+
+_cfg = None
+
+
+def queue_depth(name, depth):
+    """Sample queue length
+
+    Args:
+        name (str): which queue
+        depth (int): items in queue
+    """
+    if not _cfg.enabled:
+        return
+    with _lock:
+        if (q := _queues.get(name)) is None:
+            q = _queues[name] = PKDict(last=0, max=0, samples=0)
+        q.last = depth
+        q.samples += 1
+        if depth > q.max:
+            q.max = depth
+
+
+def reset():
+    """Clear all histograms and queue depths"""
+    with _lock:
+        _queues.clear()
+        _stages.clear()
+
+
+def since(stage, start):
+    """Record the time from start to now for stage
+
+    Args:
+        stage (str): name of stage
+        start (float): value from `stamp` (None is ignored)
+    """
+    if start is None:
+        return
+    s = time.perf_counter() - start
+    with _lock:
+        if (h := _stages.get(stage)) is None:
+            h = _stages[stage] = PKDict(
+                buckets=[0] * (len(_BUCKETS) + 1), count=0, max=0.0, total=0.0
+            )
+        h.buckets[bisect.bisect_left(_BUCKETS, s)] += 1
+        h.count += 1
+        h.total += s
+        if s > h.max:
+            h.max = s
+
+
+def stamp():
+    """Start timing a stage
+
+    Returns:
+        float: start time or None if not `_cfg.enabled`
+    """
+    return time.perf_counter() if _cfg.enabled else None
+
+
+def stats():
+    """Histograms and queue depths recorded so far
+
+    Returns:
+        PKDict: enabled, buckets (upper bounds in secs),
+            stages (name to count, max_secs, mean_secs, histogram),
+            and queues (name to last, max, samples)
+    """
+    with _lock:
+        return PKDict(
+            enabled=_cfg.enabled,
+            buckets=list(_BUCKETS) + [None],
+            stages=PKDict(
+                {
+                    k: PKDict(
+                        count=v.count,
+                        histogram=list(v.buckets),
+                        max_secs=v.max,
+                        mean_secs=v.total / v.count,
+                    )
+                    for k, v in _stages.items()
+                }
+            ),
+            queues=PKDict({k: v.copy() for k, v in _queues.items()}),
+        )
+
+
+def _init():
+    global _cfg
+
+    _cfg = pykern.pkconfig.init(
+        enabled=(
+            pykern.pkconfig.in_dev_mode(),
+            bool,
+            "record latency of monitor updates",
+        ),
+    )
+
+
+_init()
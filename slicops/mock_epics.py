@@ -24,6 +24,9 @@ _PV_VALUE = None
 
 _PV = None
 
+#: survives reset_state, because slicops.device shares PVs across tests
+_ALL_PV = []
+
 
 class PV:
     _CB_INDEX = 1
@@ -36,20 +39,24 @@ class PV:
         auto_monitor=False,
         connection_callback=None,
     ):
-        if name in _PV:
+        if name in _PV and not _PV[name]._disconnected:
             raise AssertionError(f"already exists PV={name}")
         self.pvname = name
+        self.chid = self
         self.connected = True
         self.connection_callback = connection_callback
         self.monitor_callback = None
         self._monitor_queue = None
         self._auto_monitor = False
+        self._disconnected = False
         _PV[name] = self
+        _ALL_PV.append(self)
         if callback:
             self.add_callback(callback)
         self.auto_monitor = auto_monitor
 
     def disconnect(self):
+        self._disconnected = True
         self._auto_monitor = False
         if self._monitor_queue:
             self._monitor_queue.put_nowait(None)
@@ -88,7 +95,9 @@ class PV:
         def _which():
             if "ArrayData" in self.pvname:
                 return _image
-            if "Acquire" in self.pvname or "TGT_STS" in self.pvname:
+            if any(
+                x in self.pvname for x in ("Acquire", "ShutterMode", "TGT_STS", "Size")
+            ):
                 self._monitor_queue = queue.Queue()
                 if (v := _PV_VALUE.get(self.pvname)) is not None:
                     self._monitor_queue.put_nowait(v)
@@ -102,7 +111,7 @@ class PV:
         self._auto_monitor = value
         if value:
             # we don't care the thread gets killed since this is a mock for unit
-            threading.Thread(target=_which()).start()
+            threading.Thread(target=_which(), daemon=True).start()
 
     def get(self, timeout=0):
         # TOOD(robnagler) need to be more sophisticated
@@ -120,12 +129,59 @@ class PV:
             self._monitor_queue.put_nowait(value)
         return 1
 
+    def wait_for_connection(self, timeout=None):
+        return self.connected
+
     def remove_callback(self, index):
         if index != self._CB_INDEX:
             raise AssertionError(f"invalid index={index}")
         self.monitor_callback = None
 
 
+class _CA:
+    """Emulate epics.ca"""
+
+    def get(self, chid, wait=True):
+        return chid.get() if wait else None
+
+    def get_complete(self, chid, timeout=None):
+        return chid.get()
+
+    def poll(self):
+        pass
+
+    def use_initial_context(self):
+        pass
+
+
+ca = _CA()
+
+
+def connection_lost(name):
+    """Disconnect PV as if its IOC went away
+
+    Args:
+        name (str): PV name
+    """
+    for p in _ALL_PV:
+        if p.pvname == name and not p._disconnected:
+            p.connected = False
+            p.connection_callback(conn=False)
+
+
+def image_size(size):
+    """Change image and its size PVs as if the ROI changed
+
+    Args:
+        size (int): new x size
+    """
+    v = _pv_image(size)
+    _PV_VALUE.pkupdate(v)
+    for p in _ALL_PV:
+        if p._monitor_queue and p.pvname in v:
+            p._monitor_queue.put_nowait(v[p.pvname])
+
+
 def reset_state():
     global _PV_VALUE, _PV
 
@@ -133,6 +189,7 @@ def reset_state():
         {
             "13SIM1:cam1:Acquire": 0,
             "13SIM1:cam1:N_OF_BITS": 8,
+            "13SIM1:cam1:ShutterMode": 1,
             "YAGS:IN20:211:N_OF_COL": 100,
             "YAGS:IN20:211:N_OF_ROW": 100,
             "YAGS:IN20:351:TGT_STS": 1,
@@ -0,0 +1,39 @@
+"""Latency of monitor updates in a running ui_api server
+
+:copyright: Copyright (c) 2026 The Board of Trustees of the Leland Stanford Junior University, through SLAC National Accelerator Laboratory (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All Rights Reserved.
+:license: http://github.com/slaclab/slicops/LICENSE
+"""
+
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdlog, pkdp
+import asyncio
+import pykern.api.client
+import slicops.config
+
+
+def reset():
+    """Clear histograms and queue depths in the server"""
+    _call_api("latency_reset")
+
+
+def stats():
+    """Histograms and queue depths from the server
+
+    See `slicops.latency.stats`.
+
+    Returns:
+        PKDict: stages and queues
+    """
+    return _call_api("latency_stats")
+
+
+def _call_api(api_name):
+    async def _call():
+        c = pykern.api.client.Client(slicops.config.cfg().ui_api)
+        try:
+            await c.connect()
+            return await c.call_api(api_name, PKDict())
+        finally:
+            c.destroy()
+
+    return asyncio.run(_call())
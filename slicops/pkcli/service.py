@@ -24,7 +24,7 @@ class Commands(slicops.pkcli.CommandsBase):
         """
         from pykern import pkconfig, pkresource
         from pykern.api import server
-        from slicops import config, quest, sliclet, ui_api
+        from slicops import config, device_db, quest, sliclet, ui_api
 
         from tornado import web
 
@@ -69,6 +69,7 @@ class Commands(slicops.pkcli.CommandsBase):
                 else PKDict()
             )
 
+        device_db.prewarm()
         c = config.cfg().ui_api.copy()
         server.start(
             attr_classes=quest.attr_classes(),
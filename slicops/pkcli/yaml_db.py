@@ -56,7 +56,8 @@ def write(base, *key_value_pairs):
     def _validate():
         ctx = slicops.ctx.Ctx(base, base)
         for k, v in _pairs():
-            yield k, ctx.fields[k].value_set(v)
+            # fields are shared between Ctx instances so renew to validate
+            yield k, ctx.fields[k].renew(PKDict(value=v)).value()
 
     p = path(base)
     rv = None
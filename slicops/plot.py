@@ -7,9 +7,134 @@
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
 import h5py
+import math
 import numpy
+import pykern.pkasyncio
+import pykern.pkcompat
 import pykern.pkio
 import scipy.optimize
+import slicops.latency
+import threading
+import time
+import warnings
+
+# Add/subtract in a rolling average accumulates rounding errors
+_ROLLING_RESUM_FRAMES = 1000
+
+# roi_size=auto crops to this many sigmas on either side of the mean
+_ROI_AUTO_SIGMAS = 5
+
+# Smallest auto window in pixels
+_ROI_AUTO_MIN = 32
+
+
+class Analyzer(pykern.pkasyncio.ActionLoop):
+    """Fits frames with `ImageSet.add_frame` in a separate thread
+
+    Frames are keyed, e.g. by camera, so one thread can serve
+    several cameras. A frame arriving while another frame with the
+    same key is waiting replaces it so only the newest frame is
+    fit. Keys are fit in the order they arrive.
+
+    If not in_thread, fits run in the thread calling `add_frame`.
+
+    Args:
+        handle_fit (callable): called with key, image set, fit (which may be None), and received
+        in_thread (bool): fit in the analyzer thread [True]
+    """
+
+    def __init__(self, handle_fit, in_thread=True):
+        self.__handle_fit = handle_fit
+        self.__in_thread = in_thread
+        self.__lock = threading.Lock()
+        self.__pending = PKDict()
+        self.__stats = PKDict()
+        super().__init__()
+
+    def action_fit(self, unused):
+        with self.__lock:
+            if not self.__pending:
+                # forget was called
+                return None
+            a = self.__pending.pkdel(next(iter(self.__pending)))
+        # Outside ActionLoop lock so destroy does not wait for the fit
+        return lambda: self.__fit(a)
+
+    def add_frame(self, key, image_set, frame, received=None):
+        """Queue frame to be fit
+
+        Args:
+            key (object): identifies the source of the frame
+            image_set (ImageSet): where frame is added
+            frame (ndarray): new image
+            received (float): `slicops.latency.stamp` of the monitor update [None]
+        """
+        a = PKDict(
+            key=key,
+            image_set=image_set,
+            frame=frame,
+            received=received,
+            timestamp=pykern.pkcompat.utcnow(),
+        )
+        if not self.__in_thread:
+            with self.__lock:
+                self.__stat(key)
+            self.__fit(a)
+            return
+        with self.__lock:
+            s = self.__stat(key)
+            if p := key in self.__pending:
+                s.drops += 1
+            self.__pending[key] = a
+        if not p:
+            self.action("fit", None)
+
+    def forget(self, key):
+        """Discard pending frame and stats for key
+
+        A fit in progress for key is not passed to handle_fit.
+
+        Args:
+            key (object): passed to `add_frame`
+        Returns:
+            PKDict: stats for key or None
+        """
+        with self.__lock:
+            self.__pending.pkdel(key)
+            return self.__stats.pkdel(key)
+
+    def stats(self):
+        """Cost of fits by key
+
+        Returns:
+            PKDict: key to PKDict(drops, fits, fit_secs)
+        """
+        with self.__lock:
+            return PKDict((k, v.copy()) for k, v in self.__stats.items())
+
+    def _destroy(self):
+        self.__handle_fit = None
+
+    def __fit(self, arg):
+        if (h := self.__handle_fit) is None:
+            return
+        s = slicops.latency.stamp()
+        t = time.perf_counter()
+        f = arg.image_set.add_frame(arg.frame, arg.timestamp)
+        t = time.perf_counter() - t
+        slicops.latency.since("fit", s)
+        with self.__lock:
+            if (s := self.__stats.get(arg.key)) is None:
+                # forget was called during the fit
+                return
+            s.fits += 1
+            s.fit_secs += t
+        h(arg.key, arg.image_set, f, arg.received)
+
+    def __stat(self, key):
+        if (rv := self.__stats.get(key)) is None:
+            rv = self.__stats[key] = PKDict(drops=0, fits=0, fit_secs=0.0)
+        return rv
 
 
 class ImageSet:
@@ -18,14 +143,32 @@ class ImageSet:
     Can take arbitrary meta data, e.g. pv and it will be written by
     `save_file`.
 
-    Args:
-        meta (PKDict): images_to_average, camera, curve_fit_method, pv
+    Frames are summed in place into a preallocated buffer so averaging
+    costs O(ysize * xsize) no matter how many images are averaged. Raw
+    frames are copied into a preallocated ring buffer only if
+    keep_frames, because only `save_file` needs them. The ring holds two
+    blocks so the last complete block is saved while the next fills.
 
+    By default, averages are over consecutive blocks of
+    images_to_average frames. If meta.rolling_average, the average is
+    over a sliding window, which is updated by adding the newest and
+    subtracting the oldest frame, and a fit is returned for every frame.
+
+    `add_frame` and `save_file` may be called from different threads.
+
+    Args:
+        meta (PKDict): images_to_average, camera, curve_fit_method, pv, rolling_average
+        keep_frames (bool): retain raw frames for `save_file` [True]
     """
 
-    def __init__(self, meta):
+    def __init__(self, meta, keep_frames=True):
         self.meta = meta
-        self._frames = []
+        self._keep_frames = keep_frames
+        self._lock = threading.Lock()
+        self._rolling = bool(meta.get("rolling_average"))
+        self._count = 0
+        self._frames = None
+        self._sum = None
         self._timestamps = []
         self._prev = None
 
@@ -38,38 +181,28 @@ class ImageSet:
         Returns:
             PKDict: frame and fit or None if not enough frames
         """
-
-        def _mean():
-            if self.meta.images_to_average == 1:
-                return self._frames[-1]
-            return numpy.mean(self._frames, axis=0)
-
-        self._frames.append(frame)
-        self._timestamps.append(timestamp)
-        if len(self._frames) != self.meta.images_to_average:
-            return None
-        self._prev = PKDict(
-            fit=fit_image(_mean(), self.meta.curve_fit_method),
-            frames=self._frames,
-            timestamps=self._timestamps,
-        )
-        self._frames = []
-        self._timestamps = []
-        return self._prev.fit
+        with self._lock:
+            if not self._rolling and self.meta.images_to_average == 1:
+                return self._add_single(frame, timestamp)
+            if self._sum is None or self._sum.shape != frame.shape:
+                self._alloc(frame)
+            if self._rolling:
+                return self._add_rolling(frame, timestamp)
+            return self._add_block(frame, timestamp)
 
     def save_file(self, dir_path):
         # TODO(robnagler) the naming is a bit goofy, possibly frames/{images,timestamps} and analysis.
         """Creates a hdf5 file with the structure::
             /image Group
-              /frames Dataset {images_to_average, ysize, xsize}
-              /mean Dataset {ysize, xsize}
+              /frames Dataset {images_to_average, ysize, xsize} (if keep_frames)
+              /mean Dataset {ysize, xsize} (full frame, attrs: binning, roi_x, roi_y)
               /timestamps Dataset {images_to_average}
               /x Group
-                /fit Dataset {xsize}
-                /profile Dataset {xsize}
+                /fit Dataset {roi xsize}
+                /profile Dataset {roi xsize}
               /y Group
-                /fit Dataset {ysize}
-                /profile Dataset {ysize}
+                /fit Dataset {roi ysize}
+                /profile Dataset {roi ysize}
             /meta Group (camera, curve_fit_method, images_to_average, etc.)
 
         Args:
@@ -88,7 +221,11 @@ class ImageSet:
         def _meta(h5_file):
             g = h5_file.create_group("meta")
             g.attrs.update(self.meta)
-            g.create_dataset("frames", data=self._prev.frames)
+            if self._prev.frames is not None:
+                g.create_dataset(
+                    "frames",
+                    data=self._prev.frames[self._prev.frame_index],
+                )
             g.create_dataset(
                 "timestamps",
                 data=[d.timestamp() for d in self._prev.timestamps],
@@ -109,77 +246,578 @@ class ImageSet:
             with h5py.File(path, "w") as f:
                 _meta(f)
                 g = f.create_group("image")
-                g.create_dataset("mean", data=self._prev.fit.raw_pixels)
+                g.create_dataset("mean", data=self._prev.mean)
+                g.attrs.update(
+                    binning=self._prev.fit.roi.binning,
+                    roi_x=self._prev.fit.roi.x,
+                    roi_y=self._prev.fit.roi.y,
+                )
                 _image_dim(g, "x")
                 _image_dim(g, "y")
 
-        pykern.pkio.atomic_write(_path(), writer=_writer)
+        with self._lock:
+            pykern.pkio.atomic_write(_path(), writer=_writer)
+
+    def _add_block(self, frame, timestamp):
+        if self._count == 0:
+            numpy.copyto(self._sum, frame)
+        else:
+            numpy.add(self._sum, frame, out=self._sum)
+        if self._frames is not None:
+            self._frames[self._next] = frame
+            self._next = (self._next + 1) % len(self._frames)
+        self._count += 1
+        self._timestamps.append(timestamp)
+        if (n := self.meta.images_to_average) != self._count:
+            return None
+        # The ring holds two blocks so this one starts at 0 (_next=n) or n (_next=0)
+        b = n - self._next
+        self._prev = PKDict(
+            **self._fit(self._mean(frame)),
+            frames=self._frames,
+            frame_index=slice(b, b + n),
+            timestamps=self._timestamps,
+        )
+        self._count = 0
+        self._timestamps = []
+        return self._prev.fit
+
+    def _add_rolling(self, frame, timestamp):
+        n = self.meta.images_to_average
+        i = self._next
+        if self._count == n:
+            numpy.subtract(self._sum, self._frames[i], out=self._sum)
+        else:
+            self._count += 1
+        self._frames[i] = frame
+        self._timestamps[i] = timestamp
+        self._next = (i + 1) % n
+        self._since_sum += 1
+        if self._since_sum >= _ROLLING_RESUM_FRAMES:
+            # Floating point add/subtract drifts so recompute the sum
+            numpy.sum(self._frames[: self._count], axis=0, out=self._sum)
+            self._since_sum = 0
+        else:
+            numpy.add(self._sum, self._frames[i], out=self._sum)
+        x = [(self._next - self._count + k) % n for k in range(self._count)]
+        self._prev = PKDict(
+            **self._fit(self._mean(frame)),
+            # Valid until the next add_frame, which is fine for save_file
+            frames=self._frames,
+            frame_index=x,
+            timestamps=[self._timestamps[k] for k in x],
+        )
+        return self._prev.fit
+
+    def _add_single(self, frame, timestamp):
+        # Nothing to average so frame is shared (not copied)
+        self._prev = PKDict(
+            **self._fit(frame),
+            frames=frame[numpy.newaxis] if self._keep_frames else None,
+            frame_index=slice(None),
+            timestamps=[timestamp],
+        )
+        return self._prev.fit
 
+    def _alloc(self, frame):
+        # New or resized frame so start the average over
+        n = self.meta.images_to_average
+        self._count = 0
+        self._next = 0
+        self._sum = numpy.zeros(frame.shape, dtype=numpy.float64)
+        if self._rolling:
+            self._since_sum = 0
+            self._timestamps = [None] * n
+            # The window needs the frames to subtract
+            self._frames = numpy.empty((n,) + frame.shape, dtype=frame.dtype)
+            return
+        self._timestamps = []
+        self._frames = (
+            numpy.empty((2 * n,) + frame.shape, dtype=frame.dtype)
+            if self._keep_frames
+            else None
+        )
+
+    def _fit(self, mean):
+        f = fit_image(
+            mean,
+            self.meta.curve_fit_method,
+            window=self._window(mean.shape),
+            binning=int(self.meta.get("binning") or 1),
+        )
+        return PKDict(fit=f, mean=mean)
+
+    def _mean(self, frame):
+        if self.meta.images_to_average == 1:
+            return frame
+        return self._sum / self._count
+
+    def _window(self, shape):
+        def _axis(axis, length):
+            if r := p and p[axis].fit.results:
+                # fit results are in frame coordinates with y reversed
+                c = r.mean if axis == "x" else length - 1 - r.mean
+            elif s == "auto":
+                return None
+            else:
+                c = length / 2
+            n = min(
+                length,
+                int(
+                    max(2 * _ROI_AUTO_SIGMAS * r.sig, _ROI_AUTO_MIN)
+                    if s == "auto"
+                    else s
+                ),
+            )
+            b = max(0, min(round(c - n / 2), length - n))
+            return (b, b + n)
+
+        if not (s := self.meta.get("roi_size")) or s == "full":
+            return None
+        p = self._prev and self._prev.fit
+        rv = PKDict(y=_axis("y", shape[0]), x=_axis("x", shape[1]))
+        if None in rv.values():
+            # auto needs a previous fit so use the full frame
+            return None
+        return rv
+
+
+def encode_plot(fit, max_size=None, bits=8):
+    """Reduce `fit_image` result for sending to browsers
+
+    raw_pixels is downsampled (mean of blocks) so neither dimension
+    exceeds max_size and then quantized to unsigned integers. The
+    values are approximately::
+
+        raw_pixels_encoding.offset + raw_pixels_encoding.scale * raw_pixels
+
+    The full resolution fit is not modified so it can still be saved.
+
+    Args:
+        fit (PKDict): result of `fit_image`
+        max_size (int): largest dimension of raw_pixels [None: no downsampling]
+        bits (int): 8 or 16 [8]
+    Returns:
+        PKDict: shallow copy of fit with raw_pixels replaced and raw_pixels_encoding
+    """
+    if not (t := _ENCODE_TYPES.get(bits)):
+        raise AssertionError(
+            f"invalid bits={bits} must be one of {sorted(_ENCODE_TYPES)}"
+        )
+    i = fit.raw_pixels
+    d = max(1, -(-max(i.shape) // max_size)) if max_size else 1
+    i = _bin(i, d)
+    o = float(i.min())
+    s = (float(i.max()) - o) / numpy.iinfo(t).max or 1.0
+    i = numpy.rint((i - o) / s).astype(t)
+    # see slicops.field.deepcopy
+    i.flags.writeable = False
+    return fit.copy().pkupdate(
+        raw_pixels=i,
+        raw_pixels_encoding=PKDict(
+            downsample=d,
+            dtype=t.__name__,
+            offset=o,
+            scale=s,
+        ),
+    )
 
-def fit_image(image, method):
+
+def fit_image(image, method, window=None, binning=1):
     """Attemp an analytical fit for the sum along the x and y dimensions
 
-    Uses scipy.optimize.curve_fit
+    The image is cropped to window and binned before the lineouts are
+    computed, which reduces the cost of the sums, fits, and size of
+    raw_pixels. Both lineouts are fit together by `fit_profiles`. The
+    fit results (mean, sig) are converted back to pixels of image.
 
     Args:
         image (ndarray): 2-d matrix
-        method (str): Either gaussian or  super_gaussian
+        method (str): gaussian, super_gaussian, or moments
+        window (PKDict): x & y=(start, stop) pixels to crop to [None: whole image]
+        binning (int): average binning x binning pixels [1]
+    Returns:
+        PKDict: raw_pixels, roi={x, y, binning}, x & y={lineout: sum, fit: {fit_line, results: {sig, amp, mean, offset}}
+    """
+
+    def _crop():
+        rv = PKDict(binning=binning)
+        for k, n in ("y", image.shape[0]), ("x", image.shape[1]):
+            b, e = window[k] if window else (0, n)
+            # binning must divide the window
+            rv[k] = (b, b + (e - b) // binning * binning)
+        return image[slice(*rv.y), slice(*rv.x)], rv
+
+    def _frame(results, origin):
+        if results:
+            results.mean = origin + results.mean * binning + (binning - 1) / 2
+            results.sig *= binning
+
+    i, r = _crop()
+    i = _bin(i, binning)
+    p = PKDict(x=i.sum(axis=0), y=i.sum(axis=1)[::-1])
+    rv = PKDict(raw_pixels=i, roi=r)
+    for k, f in zip(p.keys(), fit_profiles(p.values(), method)):
+        # y is reversed so its origin is the distance from the bottom
+        _frame(f.results, r.x[0] if k == "x" else image.shape[0] - r.y[1])
+        rv[k] = PKDict(lineout=p[k], fit=f)
+    return rv
+
+
+def fit_profiles(profiles, method):
+    """Fit many lineouts at once with a vectorized Levenberg-Marquardt solver
+
+    Profiles are padded to the longest and masked so lineouts of
+    different lengths share the same iterations. Jacobians are
+    analytic. The fits are seeded with `_moments`, which is also the
+    result when method is moments (no fit, gaussian fit_line). Profiles
+    which do not converge are refit one at a time with
+    `scipy.optimize.curve_fit`. Profiles whose peak does not stand out
+    from the noise (see `_has_beam`) are not fit at all, because fits
+    of noise are slow and meaningless.
+
+    Args:
+        profiles (iterable): 1-d ndarrays (lengths may differ)
+        method (str): gaussian, super_gaussian, or moments
     Returns:
-        PKDict: raw_pixels, x & y={lineout: sum, fit: {fit_line, results: {sig, amp, mean, offset}}
+        list: PKDict(fit_line, results) for each profile; results is None if the fit failed
     """
 
-    def _one(profile):
-        def _fix(results):
-            # sigma may be negative from the fit
-            results.sig = abs(results.sig)
-            return results
+    def _fix(results):
+        # sigma may be negative from the fit
+        results.sig = abs(results.sig)
+        return results
 
-        def _gaussian(x, amplitude, mean, sigma, offset):
-            return amplitude * numpy.exp(-(((x - mean) / sigma) ** 2) / 2) + offset
+    def _pad(profiles):
+        n = max(len(p) for p in profiles)
+        y = numpy.zeros((len(profiles), n))
+        w = numpy.zeros(y.shape)
+        for i, p in enumerate(profiles):
+            y[i, : len(p)] = p
+            w[i, : len(p)] = 1
+        return numpy.arange(n, dtype=float), y, w
 
-        def _super_gaussian(x, amplitude, mean, sigma, offset, p):
-            return amplitude * numpy.exp(-numpy.abs((x - mean) / sigma) ** p) + offset
+    def _fit(model, rows, seeds):
+        p, ok = _levenberg_marquardt(model, x, y[rows], w[rows], seeds[0])
+        for k in numpy.flatnonzero(~ok):
+            v = _curve_fit(model, profiles[rows[k]], [s[k] for s in seeds])
+            if v is not None:
+                p[k], ok[k] = v, True
+        return p, ok
 
-        popt = None
-        dist_keys = ["amp", "mean", "sig", "offset"]
+    def _guess(profiles):
         # TODO(pjm): should use physical camera dimensions
-        x = numpy.arange(len(profile))
-        try:
-            m = _gaussian
-            popt, pcov = scipy.optimize.curve_fit(
-                m,
-                x,
-                profile,
-                p0=[
-                    numpy.mean(profile),
-                    len(profile) / 2,
-                    len(profile) / 5,
-                    numpy.min(profile),
-                ],
-            )
-            if method == "super_gaussian":
-                # use gaussian fit to guess other distribution starting values
-                m = _super_gaussian
-                dist_keys.append("p")
-                popt, pcov = scipy.optimize.curve_fit(
-                    m, x, profile, p0=numpy.append(popt, 1.1)
-                )
-            elif method != "gaussian":
-                raise AssertionError(f"invalid fit method={method}")
-            fit_line = m(x, *popt)
-        except RuntimeError as e:
+        return numpy.array(
+            [[numpy.mean(p), len(p) / 2, len(p) / 5, numpy.min(p)] for p in profiles],
+        )
+
+    def _p0(moments, guess):
+        # flat (or empty) profiles have no moments so use a fixed guess
+        return numpy.where(
+            _is_finite(moments)[:, None] & (moments[:, 2:3] > 0), moments, guess
+        )
+
+    def _result(profile, popt):
+        if popt is None:
             # TODO(pjm): show fitting error message on curve fit method field
-            fit_line = numpy.zeros(len(x))
+            return PKDict(fit_line=numpy.zeros(len(profile)), results=None)
         return PKDict(
-            lineout=profile,
-            fit=PKDict(
-                fit_line=fit_line,
-                results=None if popt is None else _fix(PKDict(zip(dist_keys, popt))),
-            ),
+            fit_line=m(numpy.arange(len(profile), dtype=float), popt[None, :])[0],
+            results=_fix(PKDict(zip(_FIT_KEYS[method], (float(v) for v in popt)))),
         )
 
-    return PKDict(
-        raw_pixels=image,
-        x=_one(image.sum(axis=0)),
-        y=_one(image.sum(axis=1)[::-1]),
+    if method not in _FIT_KEYS:
+        raise AssertionError(f"invalid fit method={method}")
+    profiles = [numpy.asarray(p, dtype=float) for p in profiles]
+    if not profiles:
+        return []
+    x, y, w = _pad(profiles)
+    m = _gaussian
+    popt = _moments(x, y, w)
+    ok = _is_finite(popt) & _has_beam(profiles, popt[:, 0])
+    if method != "moments" and ok.any():
+        r = numpy.flatnonzero(ok)
+        g = _guess([profiles[i] for i in r])
+        popt[r], ok[r] = _fit(m, r, (_p0(popt[r], g), g))
+    if method == "super_gaussian" and ok.any():
+        # use gaussian fit to guess other distribution starting values
+        m = _super_gaussian
+        popt = numpy.column_stack((popt, numpy.full(len(popt), 1.1)))
+        r = numpy.flatnonzero(ok)
+        popt[r], ok[r] = _fit(m, r, (popt[r],))
+    return [_result(p, popt[i] if ok[i] else None) for i, p in enumerate(profiles)]
+
+
+_ENCODE_TYPES = PKDict({8: numpy.uint8, 16: numpy.uint16})
+
+_FIT_KEYS = PKDict(
+    gaussian=("amp", "mean", "sig", "offset"),
+    moments=("amp", "mean", "sig", "offset"),
+    super_gaussian=("amp", "mean", "sig", "offset", "p"),
+)
+
+# Same as scipy.optimize.curve_fit's (MINPACK) default ftol and xtol
+_LM_TOLERANCE = 1.49012e-08
+_LM_MAX_ITERATIONS = 200
+# Relative cost reduction over _LM_STALL_ITERATIONS below which a fit is stuck
+_LM_STALL_TOLERANCE = 1e-6
+_LM_STALL_ITERATIONS = 10
+_LM_LAMBDA_INITIAL = 1e-3
+# Damping this large means no step reduces the cost
+_LM_LAMBDA_MAX = 1e16
+# Smallest sig (pixels) in a fit
+_LM_SIG_MIN = 0.1
+
+# Fraction of peak (above min) below which samples are noise for moments
+_MOMENTS_THRESHOLD = 0.05
+
+# Peak (above min) to noise ratio below which a profile has no beam
+_NO_BEAM_SNR = 10
+# Profiles shorter than this are too short to estimate the noise
+_NO_BEAM_MIN_SIZE = 32
+
+# Median absolute value of second differences of unit gaussian noise
+_NOISE_MAD_SCALE = 0.6744897501960817 * math.sqrt(6)
+
+
+def _moments_sig_scale():
+    # The threshold truncates a gaussian at +/-z, which reduces the RMS
+    z = math.sqrt(-2 * math.log(_MOMENTS_THRESHOLD))
+    d = math.exp(-(z**2) / 2) / math.sqrt(2 * math.pi)
+    return 1 / math.sqrt(1 - 2 * z * d / math.erf(z / math.sqrt(2)))
+
+
+_MOMENTS_SIG_SCALE = _moments_sig_scale()
+
+
+def _bin(image, factor):
+    if factor == 1:
+        return image
+    (y, x) = (n // factor for n in image.shape)
+    return (
+        image[: y * factor, : x * factor]
+        .reshape(y, factor, x, factor)
+        .mean(axis=(1, 3))
+    )
+
+
+def _curve_fit(model, profile, seeds):
+    """Fit one profile with scipy when `_levenberg_marquardt` fails
+
+    Args:
+        model (callable): see `_levenberg_marquardt`
+        profile (ndarray): shape (L,)
+        seeds (list): initial params to try in order
+    Returns:
+        ndarray: params or None if no seed converged inside the profile
+    """
+
+    def _f(x, *params):
+        return model(x, numpy.array([params]))[0]
+
+    def _jac(x, *params):
+        return model(x, numpy.array([params]), jacobian=True)[1][0].T
+
+    x = numpy.arange(len(profile), dtype=float)
+    for s in seeds:
+        if not numpy.isfinite(s).all():
+            continue
+        try:
+            with warnings.catch_warnings():
+                # covariance is not used
+                warnings.simplefilter("ignore", scipy.optimize.OptimizeWarning)
+                rv = scipy.optimize.curve_fit(_f, x, profile, p0=s, jac=_jac)[0]
+        except (RuntimeError, ValueError):
+            continue
+        if numpy.isfinite(rv).all() and _is_beam(rv[None, :], len(x))[0]:
+            return rv
+    return None
+
+
+def _gaussian(x, params, jacobian=False):
+    a, m, s, o = (params[:, i : i + 1] for i in range(4))
+    with numpy.errstate(all="ignore"):
+        z = (x - m) / s
+        e = numpy.exp(-(z**2) / 2)
+        rv = a * e + o
+        if not jacobian:
+            return rv
+        d = a * e * z / s
+        return rv, numpy.stack((e, d, d * z, numpy.ones(rv.shape)), axis=1)
+
+
+def _has_beam(profiles, amp):
+    """Whether the peak of each profile stands out from the noise
+
+    The noise is estimated from the median absolute second difference,
+    which a beam (smooth) barely changes. Pure noise has a peak (above
+    min) of up to about 9 times the noise so `_NO_BEAM_SNR` rejects it.
+
+    Args:
+        profiles (list): 1-d ndarrays
+        amp (ndarray): shape (N,) peak above min from `_moments`
+    Returns:
+        ndarray: shape (N,) bool, True if too short to tell
+    """
+    rv = numpy.ones(len(profiles), dtype=bool)
+    for i, p in enumerate(profiles):
+        if len(p) >= _NO_BEAM_MIN_SIZE:
+            rv[i] = amp[i] > _NO_BEAM_SNR * (
+                numpy.median(numpy.abs(numpy.diff(p, 2))) / _NOISE_MAD_SCALE
+            )
+    return rv
+
+
+def _is_beam(params, size):
+    # strictly inside, because fits pinned to the edges are failures,
+    # and a negative amplitude is a dip, not a beam
+    s = numpy.abs(params[:, 2])
+    return (
+        (params[:, 0] > 0)
+        & (params[:, 1] > 0)
+        & (params[:, 1] < size - 1)
+        & (s > _LM_SIG_MIN)
+        & (s < size)
     )
+
+
+def _is_finite(params):
+    return numpy.isfinite(params).all(axis=1)
+
+
+def _levenberg_marquardt(model, x, y, weights, p0):
+    """Minimize sum of squared residuals for each row of y
+
+    Params must start with amp, mean, and sig. Steps are projected
+    so mean and sig stay inside the profile, which keeps fits of noise
+    (no beam) from drifting off to infinity. A fit which ends on
+    the boundary, which stops because no step reduces the cost
+    (lambda overflow), or which stalls (cost reduced by less than
+    `_LM_STALL_TOLERANCE` in `_LM_STALL_ITERATIONS`) has not converged.
+
+    Args:
+        model (callable): returns values (N, L) and jacobian (N, P, L) for x and params
+        x (ndarray): shape (L,)
+        y (ndarray): shape (N, L)
+        weights (ndarray): shape (N, L), zero excludes the point (padding)
+        p0 (ndarray): shape (N, P) initial params
+    Returns:
+        tuple: params (N, P), converged (N,) bool
+    """
+
+    def _cost(r):
+        return (r * r).sum(axis=1)
+
+    def _solve(a, b):
+        try:
+            return numpy.linalg.solve(a, b[..., None])[..., 0]
+        except numpy.linalg.LinAlgError:
+            return (numpy.linalg.pinv(a) @ b[..., None])[..., 0]
+
+    def _project(params, size):
+        params[:, 1] = numpy.clip(params[:, 1], 0, size - 1)
+        params[:, 2] = numpy.clip(numpy.abs(params[:, 2]), _LM_SIG_MIN, size)
+        return params
+
+    def _eval(params, y, weights):
+        f, j = model(x, params, jacobian=True)
+        r = (y - f) * weights
+        return j * weights[:, None, :], r, _cost(r)
+
+    p = numpy.array(p0, dtype=float)
+    n = weights.sum(axis=1)
+    j, r, c = _eval(p, y, weights)
+    l = numpy.full(len(p), _LM_LAMBDA_INITIAL)
+    active = numpy.isfinite(c)
+    converged = numpy.zeros(len(p), dtype=bool)
+    eye = numpy.eye(p.shape[1])
+    stall = c.copy()
+    with numpy.errstate(all="ignore"):
+        for step in range(1, _LM_MAX_ITERATIONS + 1):
+            if not active.any():
+                break
+            i = numpy.flatnonzero(active)
+            a = j[i] @ j[i].transpose(0, 2, 1)
+            d = numpy.maximum(numpy.diagonal(a, axis1=1, axis2=2), 1e-300)
+            s = _solve(
+                a + l[i, None, None] * d[:, None, :] * eye,
+                (j[i] @ r[i, :, None])[..., 0],
+            )
+            t = _project(p[i] + s, n[i])
+            jt, rt, ct = _eval(t, y[i], weights[i])
+            ok = numpy.isfinite(ct) & (ct <= c[i])
+            done = ok & (
+                (c[i] - ct <= _LM_TOLERANCE * c[i])
+                | (
+                    numpy.abs(s) <= _LM_TOLERANCE * (numpy.abs(p[i]) + _LM_TOLERANCE)
+                ).all(axis=1)
+            )
+            k = i[ok]
+            p[k], j[k], r[k], c[k] = t[ok], jt[ok], rt[ok], ct[ok]
+            l[i] = numpy.where(ok, l[i] / 10, l[i] * 10)
+            converged[i[done]] = True
+            active[i[done]] = False
+            # No step reduces the cost, which is a failure, not a minimum
+            active &= l < _LM_LAMBDA_MAX
+            if step % _LM_STALL_ITERATIONS == 0:
+                # Creeping along the boundary or a valley is a failure, too
+                active &= stall - c > _LM_STALL_TOLERANCE * stall
+                stall = c.copy()
+    return p, converged & numpy.isfinite(c) & _is_finite(p) & _is_beam(p, n)
+
+
+def _moments(x, y, weights):
+    """Centroid and RMS size from first and second moments
+
+    Samples less than `_MOMENTS_THRESHOLD` of the peak above the
+    minimum are ignored so background noise does not inflate sig.
+    sig is scaled by `_MOMENTS_SIG_SCALE` to undo the truncation for
+    gaussian beams.
+
+    Args:
+        x (ndarray): shape (L,)
+        y (ndarray): shape (N, L)
+        weights (ndarray): shape (N, L), zero excludes the point (padding)
+    Returns:
+        ndarray: shape (N, 4) amp, mean, sig, offset; not finite if profile is flat
+    """
+    v = weights > 0
+    o = numpy.where(v, y, numpy.inf).min(axis=1)
+    a = numpy.where(v, y, -numpy.inf).max(axis=1) - o
+    q = (y - o[:, None]) * weights
+    q[q < _MOMENTS_THRESHOLD * a[:, None]] = 0
+    with numpy.errstate(all="ignore"):
+        t = q.sum(axis=1)
+        m = (q * x).sum(axis=1) / t
+        s = numpy.sqrt((q * (x - m[:, None]) ** 2).sum(axis=1) / t)
+        s *= _MOMENTS_SIG_SCALE
+    return numpy.column_stack((a, m, s, o))
+
+
+def _super_gaussian(x, params, jacobian=False):
+    a, m, s, o, p = (params[:, i : i + 1] for i in range(5))
+    with numpy.errstate(all="ignore"):
+        z = (x - m) / s
+        n = numpy.abs(z)
+        u = n**p
+        e = numpy.exp(-u)
+        rv = a * e + o
+        if not jacobian:
+            return rv
+        g = a * e
+        # d|z|**p/dz is singular at z == 0 for p < 1 so use limit (0)
+        nz = n > 0
+        return rv, numpy.stack(
+            (
+                e,
+                g
+                * p
+                * numpy.sign(z)
+                * numpy.divide(u, n, out=numpy.zeros(u.shape), where=nz)
+                / s,
+                g * p * u / s,
+                numpy.ones(rv.shape),
+                -g * u * numpy.log(n, out=numpy.zeros(n.shape), where=nz),
+            ),
+            axis=1,
+        )
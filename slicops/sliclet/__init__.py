@@ -22,6 +22,7 @@ import re
 import slicops.config
 import slicops.ctx
 import slicops.field
+import slicops.latency
 import threading
 
 
@@ -92,6 +93,8 @@ class Base:
         self.__locked = False
         self.__ctx = slicops.ctx.Ctx(self.name, self.title)
         self.__work_q = queue.Queue()
+        # work taken off __work_q while coalescing ctx_write
+        self.__work_pending = None
         self.__lock = threading.RLock()
         self.__on_methods = self.__inspect_on_methods()
         txn = slicops.ctx.Txn(self.__ctx)
@@ -102,6 +105,10 @@ class Base:
         self.__thread = threading.Thread(target=self.__run, daemon=True)
         self.__thread.start()
 
+    def ctx_resync(self, version):
+        with self.__lock:
+            return self.__ctx.since(version)
+
     def ctx_write(self, field_values):
         for k, v in field_values.items():
             if not (f := self.__ctx.fields.get(k)):
@@ -121,10 +128,12 @@ class Base:
         pass
 
     @contextlib.contextmanager
-    def lock_for_update(self, log_op=None):
+    def lock_for_update(self, log_op=None, received=None):
         ok = True
+        t = slicops.latency.stamp()
         try:
             with self.__lock:
+                slicops.latency.since("sliclet_lock_wait", t)
                 if self.__locked:
                     ok = False
                     raise AssertionError("may only lock once")
@@ -138,7 +147,11 @@ class Base:
                         txn.rollback()
                     raise
                 else:
-                    txn.commit(self.__ctx_update)
+                    t = slicops.latency.stamp()
+                    txn.commit(
+                        lambda result: self.__ctx_update(result, received=received)
+                    )
+                    slicops.latency.since("sliclet_commit", t)
                 finally:
                     self.__locked = False
         except Exception as e:
@@ -179,6 +192,52 @@ class Base:
 
     def __put_work(self, work, arg):
         self.__work_q.put_nowait((work, arg))
+        slicops.latency.queue_depth("sliclet_work", self.__work_q.qsize())
+
+    def __work_get(self):
+        """Next work with consecutive ctx_write coalesced
+
+        A burst of writes to the same fields (dragging a slider) is
+        reduced to the latest values, which are applied in one
+        transaction. Writes to clickable fields are not coalesced,
+        because each click is an action.
+
+        Returns:
+            tuple: work and arg
+        """
+
+        def _coalesce(field_values):
+            for k in field_values:
+                if (m := self.__on_methods.get(k)) and m.kind == "click":
+                    return False
+            return True
+
+        def _get():
+            if (rv := self.__work_pending) is not None:
+                self.__work_pending = None
+                return rv
+            rv = self.__work_q.get()
+            self.__work_q.task_done()
+            return rv
+
+        rv = _get()
+        if rv[0] != _Work.ctx_write or not _coalesce(rv[1]):
+            return rv
+        n = 0
+        while True:
+            try:
+                w = self.__work_q.get_nowait()
+            except queue.Empty:
+                break
+            self.__work_q.task_done()
+            if w[0] != _Work.ctx_write or w[1].keys() != rv[1].keys():
+                self.__work_pending = w
+                break
+            rv = w
+            n += 1
+        if n:
+            pkdc("coalesced {} ctx_write fields={}", n, tuple(rv[1].keys()))
+        return rv
 
     def __run(self):
         def _destroy():
@@ -196,8 +255,7 @@ class Base:
             while True:
                 w = a = None
                 try:
-                    w, a = self.__work_q.get()
-                    self.__work_q.task_done()
+                    w, a = self.__work_get()
                     if not getattr(self, f"_work_{w._name_}")(a):
                         return
                 except Exception as e:
@@ -215,8 +273,16 @@ class Base:
         finally:
             _destroy()
 
-    def __ctx_update(self, result):
-        self.__loop.call_soon_threadsafe(self.__ctx_update_q.put_nowait, result)
+    def __ctx_update(self, result, received=None):
+        self.__loop.call_soon_threadsafe(
+            self.__ctx_update_put, result, slicops.latency.stamp(), received
+        )
+
+    def __ctx_update_put(self, result, start, received):
+        slicops.latency.since("event_loop", start)
+        # received is from the monitor update that caused this ctx update
+        slicops.latency.since("end_to_end", received)
+        self.__ctx_update_q.put_nowait(result)
 
     def _work_error(self, msg):
         self.__ctx_update(
@@ -0,0 +1,307 @@
+"""Several profile monitors at once
+
+:copyright: Copyright (c) 2026 The Board of Trustees of the Leland Stanford Junior University, through SLAC National Accelerator Laboratory (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All Rights Reserved.
+:license: http://github.com/slaclab/slicops/LICENSE
+"""
+
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import pykern.pkconfig
+import pykern.util
+import slicops.device
+import slicops.device.screen
+import slicops.device_db
+import slicops.plot
+import slicops.sliclet
+import threading
+import time
+
+_DEVICE_TYPE = "PROF"
+
+#: suffixes of camera_<slot>, plot_<slot>, and fit_cost_<slot>
+_SLOTS = (1, 2, 3, 4)
+
+_cfg = None
+
+
+class MultiScreen(slicops.sliclet.Base):
+    """Profile monitors on one beam path, each in a slot
+
+    Each slot has its own `slicops.device.screen.Screen`, but frames
+    from all slots are fit by a single `slicops.plot.Analyzer`
+    thread. Frames arriving faster than `_cfg.max_plot_rate` are
+    held (latest wins) and fit when the interval ends so each camera
+    is throttled independently.
+    """
+
+    def __init__(self, *args):
+        self.__slots = PKDict()
+        self.__analyzer = slicops.plot.Analyzer(self.__handle_fit)
+        super().__init__(*args)
+
+    def handle_destroy(self):
+        for s in tuple(self.__slots.keys()):
+            self.__slot_destroy(s)
+        self.__analyzer.destroy()
+
+    def handle_init(self, txn):
+        txn.multi_group_attr_set(
+            ("beam_path.constraints.choices", slicops.device_db.beam_paths())
+        )
+        for s in _SLOTS:
+            txn.multi_group_attr_set(
+                (f"plot_{s}.ui.visible", False),
+                (f"fit_cost_{s}.ui.visible", False),
+            )
+        b = _cfg.dev.beam_path if pykern.pkconfig.in_dev_mode() else None
+        txn.field_value_set("beam_path", b)
+        self.__beam_path_change(txn, b)
+
+    def on_change_beam_path(self, txn, value, **kwargs):
+        self.__beam_path_change(txn, value)
+
+    def on_change_camera_1(self, txn, value, **kwargs):
+        self.__camera_change(txn, 1, value)
+
+    def on_change_camera_2(self, txn, value, **kwargs):
+        self.__camera_change(txn, 2, value)
+
+    def on_change_camera_3(self, txn, value, **kwargs):
+        self.__camera_change(txn, 3, value)
+
+    def on_change_camera_4(self, txn, value, **kwargs):
+        self.__camera_change(txn, 4, value)
+
+    def on_change_curve_fit_method(self, txn, value, **kwargs):
+        for s in self.__slots.values():
+            s.image_set = self.__new_image_set(txn, s.device)
+
+    def on_click_start_button(self, txn, **kwargs):
+        self.__acquire(True)
+
+    def on_click_stop_button(self, txn, **kwargs):
+        self.__acquire(False)
+
+    def __acquire(self, value):
+        for s in self.__slots.values():
+            try:
+                s.device.put("acquire", value)
+            except slicops.device.DeviceError as e:
+                pkdlog("error={} on {} stack={}", e, s.device, pkdexc())
+                raise pykern.util.APIError(e)
+
+    def __beam_path_change(self, txn, value):
+        for s in tuple(self.__slots.keys()):
+            self.__slot_destroy(s, txn)
+        c = () if value is None else slicops.device_db.device_names(_DEVICE_TYPE, value)
+        for s in _SLOTS:
+            txn.multi_group_attr_set(
+                (f"camera_{s}.constraints.choices", c),
+                (f"camera_{s}.value", None),
+                (f"camera_{s}.ui.enabled", bool(c)),
+            )
+        self.__buttons(txn)
+
+    def __buttons(self, txn):
+        e = bool(self.__slots)
+        txn.multi_group_attr_set(
+            ("start_button.ui.enabled", e),
+            ("stop_button.ui.enabled", e),
+        )
+
+    def __camera_change(self, txn, slot, camera):
+        self.__slot_destroy(slot, txn)
+        for s in self.__slots.values():
+            if s.device.device_name == camera:
+                # TODO(robnagler) user alert
+                pkdlog("camera={} already in slot={}, clearing", camera, s.index)
+                txn.field_value_set(f"camera_{slot}", None)
+                return
+        if camera is None:
+            return
+        s = _Slot(slot, self.__handle_image)
+        try:
+            s.device = slicops.device.screen.Screen(
+                txn.field_value("beam_path"), camera, s
+            )
+        except slicops.device.DeviceError as e:
+            pkdlog("error={} setting up {}, clearing; stack={}", e, camera, pkdexc())
+            s.destroy()
+            txn.field_value_set(f"camera_{slot}", None)
+            return
+        s.image_set = self.__new_image_set(txn, s.device)
+        self.__slots[slot] = s
+        self.__buttons(txn)
+
+    def __handle_fit(self, slot, image_set, fit, received):
+        with self.lock_for_update(received=received) as txn:
+            if self.__slots.get(slot.index) is not slot:
+                return
+            if slot.image_set is not image_set or fit is None:
+                return
+            c = self.__analyzer.stats()[slot]
+            i = slot.index
+            txn.multi_group_attr_set(
+                (f"plot_{i}.ui.visible", True),
+                (f"fit_cost_{i}.ui.visible", True),
+            )
+            txn.field_value_set(
+                f"plot_{i}",
+                slicops.plot.encode_plot(
+                    fit, max_size=_cfg.plot.max_size, bits=_cfg.plot.bits
+                ),
+            )
+            txn.field_value_set(
+                f"fit_cost_{i}",
+                f"{c.fit_secs / c.fits * 1000:.1f} ms/fit, {c.drops} dropped",
+            )
+
+    def __handle_image(self, slot, image, received):
+        with self.lock_for_update(received=received) as txn:
+            if self.__slots.get(slot.index) is not slot:
+                return
+            if image is None or not image.size:
+                return
+            if (w := slot.publish_wait()) > 0:
+                # Hold the latest frame until the interval ends
+                if slot.held is not None:
+                    slot.throttled += 1
+                slot.held = PKDict(image=image, received=received)
+                if slot.flush_timer is None:
+                    slot.flush_timer = threading.Timer(w, self.__flush_image, (slot,))
+                    slot.flush_timer.daemon = True
+                    slot.flush_timer.start()
+                return
+            slot.published = time.monotonic()
+            i = slot.image_set
+        # Fit outside the lock so ctx writes are not blocked
+        self.__analyzer.add_frame(slot, i, image, received=received)
+
+    def __flush_image(self, slot):
+        with self.lock_for_update() as txn:
+            slot.flush_timer = None
+            h, slot.held = slot.held, None
+        if h is not None:
+            self.__handle_image(slot, h.image, h.received)
+
+    def __new_image_set(self, txn, device):
+        return slicops.plot.ImageSet(
+            txn.multi_field_value(("beam_path", "curve_fit_method")).pkupdate(
+                camera=device.device_name,
+                csi_name=device.meta.csi_name,
+                images_to_average=1,
+            ),
+            keep_frames=False,
+        )
+
+    def __slot_destroy(self, slot, txn=None):
+        if (s := self.__slots.pkdel(slot)) is None:
+            return
+        c = self.__analyzer.forget(s)
+        pkdlog(
+            "camera={} fit_stats={} throttled={} monitor_drops={}",
+            s.device.device_name,
+            c,
+            s.throttled,
+            s.device.monitor_drops(),
+        )
+        s.destroy()
+        if txn:
+            txn.multi_group_attr_set(
+                (f"plot_{slot}.ui.visible", False),
+                # Useful to avoid large ctx sends
+                (f"plot_{slot}.value", None),
+                (f"fit_cost_{slot}.ui.visible", False),
+                (f"fit_cost_{slot}.value", None),
+            )
+            self.__buttons(txn)
+
+
+CLASS = MultiScreen
+
+
+class _Slot(slicops.device.screen.EventHandler):
+    """State of one camera
+
+    Only images are used. Acquire and target status updates are ignored.
+    """
+
+    def __init__(self, index, handle_image):
+        self.index = index
+        self.device = None
+        self.flush_timer = None
+        self.held = None
+        self.image_set = None
+        self.published = 0.0
+        self.throttled = 0
+        self.__destroyed = False
+        self.__handle_image = handle_image
+        self.__lock = threading.Lock()
+
+    def destroy(self):
+        with self.__lock:
+            if self.__destroyed:
+                return
+            self.__destroyed = True
+            self.__handle_image = None
+        if self.flush_timer:
+            self.flush_timer.cancel()
+        if self.device:
+            try:
+                self.device.destroy()
+            except Exception as e:
+                pkdlog("destroy device={} error={}", self.device, e)
+
+    def on_screen_device_error(self, exc):
+        pkdlog("slot={} device={} error={}", self.index, self.device, exc)
+
+    def publish_wait(self):
+        """Seconds until the next frame may be fit
+
+        Returns:
+            float: <= 0 if the frame may be fit now
+        """
+        if _cfg.max_plot_rate <= 0:
+            return 0
+        return self.published + 1 / _cfg.max_plot_rate - time.monotonic()
+
+    def on_screen_device_health(self, accessor_name, health):
+        if not health.connected:
+            pkdlog(
+                "slot={} device={} accessor={} health={}",
+                self.index,
+                self.device,
+                accessor_name,
+                health,
+            )
+
+    def on_screen_device_update(self, accessor_name, value, received=None):
+        if accessor_name != "image" or (h := self.__handle_image) is None:
+            return
+        h(self, value, received)
+
+
+def _init():
+    global _cfg
+
+    _cfg = pykern.pkconfig.init(
+        dev=PKDict(
+            beam_path=("DEV_BEAM_PATH", str, "dev beam path name"),
+        ),
+        max_plot_rate=(
+            2.0,
+            float,
+            "maximum plots per second per camera; faster frames are held (0 is unlimited)",
+        ),
+        plot=PKDict(
+            bits=(8, int, "quantize plot pixels sent to browsers to 8 or 16 bits"),
+            max_size=(
+                256,
+                int,
+                "downsample plot pixels sent to browsers to at most this size",
+            ),
+        ),
+    )
+
+
+_init()
@@ -6,7 +6,6 @@
 
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
-import pykern.pkcompat
 import pykern.pkconfig
 import pykern.util
 import queue
@@ -68,6 +67,8 @@ _DEVICE_DISABLE = (
         ("plot.value", None),
         ("csi_name.ui.visible", False),
         ("csi_name.value", None),
+        ("device_status.ui.visible", False),
+        ("device_status.value", None),
         ("save_to_file.ui.enabled", False),
         ("save_to_file.ui.visible", False),
     )
@@ -93,10 +94,14 @@ _PLOT_ENABLE = (
 class Screen(slicops.sliclet.Base):
     def __init__(self, *args):
         self.__current_value = PKDict(acquire=None, image=None, target=None)
+        self.__analyzer = slicops.plot.Analyzer(
+            self.__handle_fit, in_thread=_cfg.analysis.in_thread
+        )
         super().__init__(*args)
 
     def handle_destroy(self):
         self.__device_destroy()
+        self.__analyzer.destroy()
 
     def on_change_camera(self, txn, value, **kwargs):
         self.__device_change(txn, txn.field_value("beam_path"), value)
@@ -112,6 +117,15 @@ class Screen(slicops.sliclet.Base):
         # TODO(robnagler) optimize with ImageSet.update_images_to_average()
         self.__new_image_set(txn)
 
+    def on_change_binning(self, txn, value, **kwargs):
+        self.__new_image_set(txn)
+
+    def on_change_roi_size(self, txn, value, **kwargs):
+        self.__new_image_set(txn)
+
+    def on_change_rolling_average(self, txn, value, **kwargs):
+        self.__new_image_set(txn)
+
     def on_click_save_to_file(self, txn, **kwargs):
         # TODO(pjm) provide UI notice with file info, download link
         self.__image_set.save_file(self.save_file_path())
@@ -135,6 +149,7 @@ class Screen(slicops.sliclet.Base):
 
     def handle_init(self, txn):
         self.__device = None
+        self.__disconnected = set()
         self.__handler = None
         self.__single_button = False
         txn.multi_group_attr_set(
@@ -197,6 +212,7 @@ class Screen(slicops.sliclet.Base):
             return
         self.__image_set = None
         self.__single_button = False
+        self.__disconnected = set()
         self.__handler.destroy()
         self.__handler = None
         try:
@@ -212,6 +228,7 @@ class Screen(slicops.sliclet.Base):
     def __device_setup(self, txn, beam_path, camera):
         self.__handler = _Handler(
             self.__handle_device_error,
+            self.__handle_device_health,
             PKDict(
                 image=self.__handle_image,
                 acquire=self.__handle_acquire,
@@ -239,8 +256,8 @@ class Screen(slicops.sliclet.Base):
         txn.multi_group_attr_set(s)
         self.__new_image_set(txn)
 
-    def __handle_acquire(self, acquire):
-        with self.lock_for_update() as txn:
+    def __handle_acquire(self, acquire, received):
+        with self.lock_for_update(received=received) as txn:
             self.__current_value["acquire"] = acquire
             n = not acquire
             # Leave plot alone
@@ -258,16 +275,45 @@ class Screen(slicops.sliclet.Base):
     def __handle_device_error(self, exc):
         self.put_exception(exc)
 
-    def __handle_image(self, image):
+    def __handle_device_health(self, accessor_name, health):
         with self.lock_for_update() as txn:
-            self.__current_value["image"] = image
-            if self.__update_plot(txn) and self.__single_button:
+            if not self.__device or not self.__handler:
+                return
+            if health.connected:
+                self.__disconnected.discard(accessor_name)
+            else:
+                pkdlog("{} accessor={} health={}", self.__device, accessor_name, health)
+                self.__disconnected.add(accessor_name)
+            d = sorted(self.__disconnected)
+            txn.multi_group_attr_set(
+                ("device_status.ui.visible", bool(d)),
+                ("device_status.value", f"disconnected: {', '.join(d)}" if d else None),
+            )
+
+    def __handle_fit(self, camera, image_set, fit, received):
+        with self.lock_for_update(received=received) as txn:
+            # image_set is replaced when the device or the settings change
+            if image_set is not self.__image_set:
+                return
+            if self.__update_plot(txn, fit) and self.__single_button:
                 self.__set(txn, "acquire", False, _BUTTONS_DISABLE)
                 txn.multi_group_attr_set(
                     ("single_button.ui.enabled", True),
                     ("start_button.ui.enabled", True),
                 )
 
+    def __handle_image(self, image, received):
+        with self.lock_for_update(received=received) as txn:
+            self.__current_value["image"] = image
+            if not self.__device or not self.__handler:
+                return
+            if image is None or not image.size:
+                return
+            c = self.__device.device_name
+            s = self.__image_set
+        # Fit outside the lock so ctx writes are not blocked
+        self.__analyzer.add_frame(c, s, image, received=received)
+
     def __new_image_set(self, txn):
         self.__image_set = slicops.plot.ImageSet(
             txn.multi_field_value(
@@ -276,13 +322,17 @@ class Screen(slicops.sliclet.Base):
                     "camera",
                     "curve_fit_method",
                     "images_to_average",
+                    "rolling_average",
+                    "roi_size",
+                    "binning",
                     "csi_name",
                 )
             ),
+            keep_frames=_cfg.save_frames,
         )
 
-    def __handle_target_status(self, status):
-        with self.lock_for_update() as txn:
+    def __handle_target_status(self, status, received):
+        with self.lock_for_update(received=received) as txn:
             self.__current_value["target"] = status
             txn.multi_group_attr_set(
                 ("target_status", status.name),
@@ -325,16 +375,20 @@ class Screen(slicops.sliclet.Base):
             )
             raise pykern.util.APIError(e)
 
-    def __update_plot(self, txn):
+    def __update_plot(self, txn, fit):
         if not self.__device or not self.__handler:
             return False
-        if (i := self.__current_value["image"]) is None or not i.size:
-            return False
-        if (p := self.__image_set.add_frame(i, pykern.pkcompat.utcnow())) is None:
+        if (p := fit) is None:
             return False
         if not txn.group_attr("plot", "ui", "visible"):
             txn.multi_group_attr_set(_PLOT_ENABLE)
-        txn.field_value_set("plot", p)
+        # ImageSet keeps the full resolution for save_file
+        txn.field_value_set(
+            "plot",
+            slicops.plot.encode_plot(
+                p, max_size=_cfg.plot.max_size, bits=_cfg.plot.bits
+            ),
+        )
         return True
 
     def __user_alert(self, txn, fmt, *args):
@@ -348,11 +402,13 @@ class _Handler(slicops.device.screen.EventHandler):
     def __init__(
         self,
         handle_device_error,
+        handle_device_health,
         handle_device_update,
     ):
         self.__destroyed = False
         self.__lock = threading.Lock()
         self.__handle_device_error = handle_device_error
+        self.__handle_device_health = handle_device_health
         self.__handle_device_update = handle_device_update
 
     def destroy(self):
@@ -361,27 +417,52 @@ class _Handler(slicops.device.screen.EventHandler):
                 return
             self.__destroyed = True
             self.__handle_device_error = None
+            self.__handle_device_health = None
             self.__handle_device_update = None
 
     def on_screen_device_error(self, exc):
         self.__handle_device_error(exc)
 
-    def on_screen_device_update(self, accessor_name, value):
+    def on_screen_device_health(self, accessor_name, health):
+        if h := self.__handle_device_health:
+            h(accessor_name, health)
+
+    def on_screen_device_update(self, accessor_name, value, received=None):
         # TODO move prev value to sliclet within txn
         if not accessor_name in self.__handle_device_update:
             raise AssertionError(f"unsupported accessor={n} {self}")
         h = self.__handle_device_update[accessor_name]
-        h(value)
+        h(value, received)
 
 
 def _init():
     global _cfg
 
     _cfg = pykern.pkconfig.init(
+        analysis=PKDict(
+            in_thread=(
+                True,
+                bool,
+                "fit images in a separate thread so sliclet is responsive during fits",
+            ),
+        ),
         dev=PKDict(
             beam_path=("DEV_BEAM_PATH", str, "dev beam path name"),
             camera=("DEV_CAMERA", str, "dev camera name"),
         ),
+        plot=PKDict(
+            bits=(8, int, "quantize plot pixels sent to browsers to 8 or 16 bits"),
+            max_size=(
+                512,
+                int,
+                "downsample plot pixels sent to browsers to at most this size",
+            ),
+        ),
+        save_frames=(
+            True,
+            bool,
+            "save raw frames, not just their average, in save files",
+        ),
     )
 
 
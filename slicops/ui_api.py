@@ -9,6 +9,7 @@ from pykern.pkdebug import pkdc, pkdlog, pkdp
 import asyncio
 import pykern.api.util
 import pykern.util
+import slicops.latency
 import slicops.quest
 import slicops.sliclet
 
@@ -24,6 +25,21 @@ _SLICLET_KEY = "sliclet"
 class API(slicops.quest.API):
     """Implementation for the Screen (Profile Monitor) application"""
 
+    async def api_latency_reset(self, api_args):
+        slicops.latency.reset()
+        return PKDict()
+
+    async def api_latency_stats(self, api_args):
+        return slicops.latency.stats()
+
+    async def api_ui_ctx_resync(self, api_args):
+        v = api_args.get("version")
+        if not isinstance(v, int) or isinstance(v, bool):
+            raise pykern.util.APIError("invalid version={}", v)
+        if _SLICLET_KEY not in self.session:
+            raise pykern.util.APIError("no subscription")
+        return self.session[_SLICLET_KEY].ctx_resync(v)
+
     @pykern.api.util.subscription
     async def api_ui_ctx_update(self, api_args):
         # TODO(robnagler) reply with an error that doesn't
@@ -46,7 +62,10 @@ class API(slicops.quest.API):
                     return None
                 if isinstance(r, Exception):
                     raise r
+                slicops.latency.queue_depth("ctx_update", q.qsize())
+                t = slicops.latency.stamp()
                 self.subscription.result_put(r)
+                slicops.latency.since("result_put", t)
         finally:
             if "session" in self:
                 self.session.pkdel(_UPDATE_Q_KEY)
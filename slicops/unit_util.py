@@ -18,6 +18,8 @@ class SlicletSetup(pykern.api.unit_util.Setup):
         self.__sliclet = sliclet
         super().__init__(*args, **kwargs)
         self.__update_q = asyncio.Queue()
+        # fields merged from all updates returned by ctx_update
+        self.ctx_fields = None
         self.__http_uri = (
             f"http://{self.http_config.tcp_ip}:{self.http_config.tcp_port}"
         )
@@ -30,6 +32,7 @@ class SlicletSetup(pykern.api.unit_util.Setup):
         self.__update_q.task_done()
         if r is None:
             pkunit.pkfail("subscription ended unexpectedly")
+        self.__ctx_merge(r)
         return r
 
     async def ctx_field_value_set(self, **kwargs):
@@ -96,6 +99,27 @@ class SlicletSetup(pykern.api.unit_util.Setup):
             c = m.group(1)
         pkdebug.pkdlog("{} op={}", c, pkinspect.caller_func_name())
 
+    def __ctx_merge(self, update):
+        from slicops import field
+
+        if self.ctx_fields is None:
+            self.ctx_fields = field.deepcopy(update.fields)
+            return
+        for k, v in update.fields.items():
+            if (f := self.ctx_fields.get(k)) is None:
+                self.ctx_fields[k] = field.deepcopy(v)
+                continue
+            for g, a in v.items():
+                if g == "value" or not isinstance(f.get(g), dict):
+                    f[g] = field.deepcopy(a)
+                    continue
+                for n, x in a.items():
+                    if x is None:
+                        # removed on the server
+                        f[g].pkdel(n)
+                    else:
+                        f[g][n] = field.deepcopy(x)
+
     async def __subscribe(self):
         from pykern import pkdebug
         from pykern.pkcollections import PKDict
@@ -36,6 +36,67 @@ def test_txn():
     pkunit.pkeq(v, txn.group_attr("run_mode.constraints.choices"))
     pkunit.pkeq(v, txn.group_attr("run_mode", "constraints", "choices"))
     r = PKDict()
-    txn.commit(lambda x: r.pkupdate(fields=x.fields))
+    txn.commit(lambda x: r.pkupdate(x))
     pkunit.pkeq(None, r.fields.run_mode.value)
+    pkunit.pkeq(1, r.version)
+    txn = ctx.Txn(c)
+    txn.multi_group_attr_set(("run_mode.ui.enabled", False), ("run_mode.value", None))
+    r = PKDict()
+    txn.commit(lambda x: r.pkupdate(x))
+    # only changed attrs
+    pkunit.pkeq(PKDict(run_mode=PKDict(ui=PKDict(enabled=False))), r.fields)
+    pkunit.pkeq(2, r.version)
+    pkunit.pkeq(["run_mode"], list(c.since(0).fields.keys()))
+    pkunit.pkeq(PKDict(), c.since(2).fields)
     # TODO(robnagler) more tests
+
+
+def test_txn_enum_speed():
+    from pykern import pkunit
+    from slicops import ctx
+    import time
+
+    def _secs(*args):
+        t = time.perf_counter()
+        for i in range(200):
+            txn = ctx.Txn(c)
+            txn.multi_group_attr_set(*(x(i) for x in args))
+            txn.commit(None)
+        return time.perf_counter() - t
+
+    c = ctx.Ctx("input", "Input", path=pkunit.data_dir().join("simple.in"))
+    v = tuple(f"choice_{i}" for i in range(1000))
+    txn = ctx.Txn(c)
+    txn.multi_group_attr_set(
+        ("run_mode.constraints.choices", v), ("run_mode.value", v[0])
+    )
+    txn.commit(None)
+    # Enum reuses its choices map when choices are not replaced
+    s = (
+        _secs(lambda i: ("run_mode.constraints.nullable", bool(i % 2))),
+        _secs(lambda i: ("run_mode.constraints.choices", v)),
+    )
+    pkunit.pkok(s[0] * 5 < s[1], "no speedup secs(reused, new map)={}", s)
+
+
+def test_compiled():
+    from pykern import pkio, pkunit
+    from slicops import ctx
+    import os
+
+    d = pkunit.work_dir()
+    pkio.unchecked_remove(d.join("sliclet"))
+    p = d.join("sliclet").ensure(dir=True).join("input.yaml")
+    pkunit.data_dir().join("simple.in/sliclet/input.yaml").copy(p)
+    c = ctx.Ctx("input", "Input", path=d)
+    txn = ctx.Txn(c)
+    txn.field_value_set("increment", 7)
+    txn.commit(None)
+    c2 = ctx.Ctx("input", "Input", path=d)
+    pkunit.pkeq(5, c2.fields.increment.value())
+    pkunit.pkok(c2.fields.divisor is c.fields.divisor, "fields not shared")
+    pkio.write_text(p, pkio.read_text(p).replace("value: 5", "value: 6"))
+    s = os.stat(p)
+    # mtime may not change within the filesystem's resolution
+    os.utime(p, ns=(s.st_atime_ns, s.st_mtime_ns + 1_000_000_000))
+    pkunit.pkeq(6, ctx.Ctx("input", "Input", path=d).fields.increment.value())
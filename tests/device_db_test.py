@@ -27,7 +27,16 @@ def test_basic():
     a = device_db.meta_for_device("VCCB")
     pkunit.pkeq("CAMR:LGUN:950:Image:ArrayData", a.accessor.image.csi_name)
     pkunit.pkeq(numpy.ndarray, a.accessor.image.py_type)
+    pkunit.pkeq(
+        (0, 60), (a.accessor.image.max_age_secs, a.accessor.n_bits.max_age_secs)
+    )
     pkunit.pkeq("GUNB", a.beam_area)
+    # Cached, but callers get their own copy
+    a.accessor.image.csi_name = "xyzzy"
+    pkunit.pkeq(
+        "CAMR:LGUN:950:Image:ArrayData",
+        device_db.meta_for_device("VCCB").accessor.image.csi_name,
+    )
 
     # YAG01B does not have any accessors so not in db
     with pkunit.pkexcept("NoRows"):
@@ -42,3 +51,5 @@ def test_upstream():
     pkunit.pkeq(9, len(a))
     pkunit.pkeq("YAG01", a[0], "Lowest Z Prof")
     pkunit.pkeq("OTR4", a[-1], "Closest Z Prof")
+    with pkunit.pkexcept("not in beam_path"):
+        device_db.upstream_devices("PROF", "target_control", "SC_SXR", "OTR11")
@@ -0,0 +1,62 @@
+"""Test slicops.device.screen max_publish_rate and coalesce_accessors
+
+:copyright: Copyright (c) 2026 The Board of Trustees of the Leland Stanford Junior University, through SLAC National Accelerator Laboratory (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All Rights Reserved.
+:license: http://github.com/slaclab/slicops/LICENSE
+"""
+
+import os
+
+# Separate process, because config is read on import
+os.environ.update(
+    SLICOPS_DEVICE_SCREEN_COALESCE_ACCESSORS="image, target_status",
+    SLICOPS_DEVICE_SCREEN_MAX_PUBLISH_RATE="5",
+)
+
+
+def test_burst():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkunit import pkeq, pkfail, pkok
+    from slicops import unit_util
+    from slicops.device import screen
+    import numpy, time
+
+    def _image(value):
+        return numpy.full(p.get().shape, value)
+
+    # Keep the mock image monitor from sending values or disconnecting
+    mock_epics.MONITOR_SLEEP = 60
+    mock_epics.reset_state()
+    h = unit_util._screen_handler()
+    d = screen.Screen("DEV_BEAM_PATH", "DEV_CAMERA", h)
+    try:
+        for _ in range(20):
+            p = [x for x in mock_epics._ALL_PV if "ArrayData" in x.pvname]
+            if p and p[0].monitor_callback:
+                p = p[0]
+                break
+            time.sleep(0.1)
+        else:
+            pkfail("image monitor not started")
+        p.monitor_callback(value=_image(0))
+        pkeq(0, h.test_get("image")[0, 0])
+        # Burst within the interval after a publish: only the latest is delivered
+        for v in range(1, 11):
+            p.monitor_callback(value=_image(v))
+        pkeq(10, h.test_get("image")[0, 0])
+        pkeq(9, d.monitor_drops().image)
+        time.sleep(0.5)
+        pkok(h.event_q.image.empty(), "unexpected image")
+    finally:
+        d.destroy()
+
+
+def test_coalesce_accessors():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkunit import pkeq, pkexcept
+    from slicops.device import screen
+
+    pkeq(("image", "target_status"), screen._cfg.coalesce_accessors)
+    with pkexcept("unknown accessors.*xyzzy"):
+        screen._cfg_coalesce_accessors("image,xyzzy")
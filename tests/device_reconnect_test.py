@@ -0,0 +1,40 @@
+"""Test slicops.device reconnect
+
+:copyright: Copyright (c) 2026 The Board of Trustees of the Leland Stanford Junior University, through SLAC National Accelerator Laboratory (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All Rights Reserved.
+:license: http://github.com/slaclab/slicops/LICENSE
+"""
+
+import os
+
+# Separate from device_test, because mock_epics image monitors disconnect
+os.environ.update(SLICOPS_DEVICE_RECONNECT_MIN_SECS="0.1")
+
+
+def test_reconnect():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkunit import pkeq, pkok
+    from slicops import device
+    import time
+
+    def _wait(cond):
+        for _ in range(20):
+            if cond():
+                return
+            time.sleep(mock_epics.MONITOR_SLEEP)
+
+    mock_epics.reset_state()
+    d = device.Device("DEV_CAMERA")
+    u = []
+    d.accessor("acquire").monitor(u.append)
+    _wait(lambda: d.health().acquire.connected)
+    mock_epics.connection_lost(d.meta.accessor.acquire.csi_name)
+    pkeq(False, d.health().acquire.connected)
+    _wait(lambda: d.health().acquire.connected)
+    h = d.health().acquire
+    pkeq((True, 1, 1), (h.connected, h.disconnects, h.reconnects))
+    # Monitor resumes on the new PV
+    d.put("acquire", True)
+    _wait(lambda: u[-1].get("value"))
+    pkeq(True, u[-1].value)
+    pkok(d.health().acquire.updates >= 2, "updates={}", d.health().acquire)
@@ -4,20 +4,48 @@
 :license: http://github.com/slaclab/slicops/LICENSE
 """
 
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_async():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkunit import pkeq
+    from slicops import device
+
+    mock_epics.reset_state()
+    d = device.Device("DEV_CAMERA")
+    pkeq((65, 50), (await d.aget("image")).shape)
+    m = d.amonitor("acquire")
+    await d.aput("acquire", True)
+    async for c in m:
+        if c.get("value"):
+            break
+    await m.aclose()
+    pkeq(True, await d.aget("acquire"))
+    d.destroy()
+
 
 def test_basic():
     # Must be first
     from slicops import mock_epics
+    from pykern.pkcollections import PKDict
     from pykern.pkunit import pkeq
     from slicops import device
 
     mock_epics.reset_state()
     d = device.Device("DEV_CAMERA")
+    d.connect(("image", "acquire"))
     # Reshape switches x & y
     pkeq((65, 50), d.get("image").shape)
     pkeq(False, d.get("acquire"))
     d.put("acquire", True)
     pkeq(True, d.get("acquire"))
+    # n_bits has a max_age_secs so only read once
+    pkeq(d.get("n_bits"), d.get("n_bits"))
+    pkeq(PKDict(hits=1, misses=1), d.cache_stats().n_bits)
+    pkeq(PKDict(hits=0, misses=2), d.cache_stats().acquire)
 
 
 def test_monitor():
@@ -61,3 +89,143 @@ def test_monitor():
     time.sleep(count * 2 * mock_epics.MONITOR_SLEEP)
     pkeq(0, count)
     pkeq(False, connected)
+
+
+def test_shared_pv():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkunit import pkeq
+    from slicops import device
+
+    mock_epics.reset_state()
+    # mock_epics does not allow a PV to be created twice
+    d = [device.Device(n) for n in ("DEV_CAMERA", "DEV_CAMERA2")]
+    pkeq(d[0].get("n_row"), d[1].get("n_row"))
+    d[0].put("acquire", True)
+    pkeq(True, d[1].get("acquire"))
+    for x in d:
+        x.destroy()
+    # Released PVs are reused within pv_release_secs
+    pkeq(True, device.Device("DEV_CAMERA").get("acquire"))
+
+
+def test_image_shape_change():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkunit import pkeq
+    from slicops import device
+    import numpy, time
+
+    mock_epics.reset_state()
+    d = device.Device("DEV_CAMERA")
+    pkeq((65, 50), d.get("image").shape)
+    # PVs are shared with later tests so restore the size
+    for x, e in (100, (130, 100)), (50, (65, 50)):
+        mock_epics.image_size(x)
+        for _ in range(20):
+            try:
+                if e == d.get("image").shape:
+                    break
+            except device.DeviceError:
+                # n_row updated, but not n_col yet
+                pass
+            time.sleep(mock_epics.MONITOR_SLEEP)
+        pkeq(e, d.get("image").shape)
+    # Same size, but transposed
+    a = d.accessor("image")
+    pkeq(None, a._fixup_value(numpy.zeros((50, 65))))
+    pkeq((65, 50), a._fixup_value(numpy.zeros((65, 50))).shape)
+
+
+def test_many():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkcollections import PKDict
+    from pykern.pkunit import pkeq
+    from slicops import device
+    import time
+
+    mock_epics.reset_state()
+    d = [device.Device(n) for n in ("DEV_CAMERA", "YAG01")]
+    g = ((d[0], "acquire"), (d[1], "target_status"))
+    # The image shape is read in the batch, not with blocking gets
+    d[0].get = None
+    r = device.get_many(g + ((d[0], "image"),))
+    del d[0].get
+    pkeq([False, 2], [x.value for x in r[:2]])
+    pkeq((65, 50), r[2].value.shape)
+    pkeq(
+        [PKDict()] * 2 + [PKDict(error=f"read-only {d[0].accessor('n_row')}")],
+        device.put_many(
+            ((d[0], "acquire", 1), (d[1], "target_control", 0), (d[0], "n_row", 3))
+        ),
+    )
+    pkeq([True, 1], [x.value for x in device.get_many(g)])
+    # Monitored values are cached so put_many must clear the cache
+    u = []
+    d[0].accessor("acquire").monitor(u.append)
+    for _ in range(20):
+        if u and u[-1].get("value") is True:
+            break
+        time.sleep(mock_epics.MONITOR_SLEEP)
+    pkeq(True, d[0].get("acquire"))
+    pkeq([PKDict()], device.put_many(((d[0], "acquire", 0),)))
+    pkeq(False, d[0].get("acquire"))
+    # Disconnected during the put
+    p = d[1].accessor("target_control")._connect()
+    p.put = lambda value: setattr(p, "connected", False) or 1
+    try:
+        pkeq(
+            [PKDict(error=f"disconnected {d[1].accessor('target_control')}")],
+            device.put_many(((d[1], "target_control", 1),)),
+        )
+    finally:
+        del p.put
+        p.connected = True
+
+
+def test_connect_timeout():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkunit import pkexcept
+    from slicops import device
+
+    mock_epics.reset_state()
+    d = device.Device("YAG01")
+    x = d.accessor("target_status")
+    # As if another thread never finished acquiring the PV
+    x._initializing = True
+    t = device._TIMEOUT
+    device._TIMEOUT = 0.1
+    try:
+        with pkexcept("DeviceError.*unable to connect.*target_status"):
+            d.connect(("target_status",))
+        with pkexcept("DeviceError.*unable to connect.*target_status"):
+            x.get()
+    finally:
+        device._TIMEOUT = t
+
+
+def test_destroy_connecting():
+    # Must be first
+    from slicops import mock_epics
+    from pykern.pkunit import pkexcept, pkok
+    from slicops import device
+
+    def _acquire(accessor, monitor):
+        rv = a(accessor, monitor)
+        # As if another thread destroyed the device during the acquire
+        accessor.destroy()
+        return rv
+
+    mock_epics.reset_state()
+    x = device.Device("YAG01").accessor("target_status")
+    a = device._pv_pool.acquire
+    device._pv_pool.acquire = _acquire
+    try:
+        with pkexcept("destroyed"):
+            x.get()
+    finally:
+        device._pv_pool.acquire = a
+    p = device._pv_pool._pvs.get(x.meta.csi_name)
+    pkok(p is None or x not in p.accessors, "accessor not released")
@@ -42,3 +42,43 @@ def test_classes():
     pkunit.pkeq(None, f.value_check(""))
     r = f.value_check("4")
     pkunit.pkeq("unknown choice", r.msg)
+
+
+def test_deepcopy():
+    from pykern.pkcollections import PKDict
+    from pykern import pkunit
+    from slicops import field
+    import numpy
+
+    r = numpy.zeros((2, 3))
+    r.flags.writeable = False
+    w = numpy.zeros((2, 3))
+    c = field.deepcopy(PKDict(value=PKDict(raw_pixels=r, x=[w])))
+    pkunit.pkok(c.value.raw_pixels is r, "read-only ndarray was copied")
+    pkunit.pkok(c.value.x[0] is not w, "writeable ndarray was shared")
+
+
+def test_renew():
+    from pykern.pkcollections import PKDict
+    from pykern import pkunit
+    from slicops import field
+
+    f = field.prototypes().Enum.new(
+        PKDict(name="colors", constraints=PKDict(choices=["red", "green"]))
+    )
+    r = f.renew(PKDict(ui=PKDict(enabled=False)))
+    pkunit.pkeq(False, r._attrs.ui.enabled)
+    pkunit.pkeq(True, f._attrs.ui.enabled)
+    pkunit.pkok(r._attrs.constraints is f._attrs.constraints, "constraints copied")
+    r = r.renew(PKDict(value="GREEN"))
+    pkunit.pkeq("green", r.value())
+    r = r.renew(PKDict(constraints=PKDict(nullable=False)))
+    pkunit.pkeq("red", r.value_check("RED"))
+    pkunit.pkeq("unknown choice", r.value_check("blue").msg)
+    pkunit.pkeq(None, f.value())
+    with pkunit.pkexcept("unknown choice"):
+        r.renew(PKDict(value="blue"))
+    r = r.renew(PKDict(constraints=PKDict(choices=["blue"]), value="blue"))
+    pkunit.pkeq("blue", r.value())
+    pkunit.pkeq("unknown choice", r.value_check("red").msg)
+    pkunit.pkeq(PKDict(red="red", green="green"), f._attrs.constraints.choices)
@@ -7,12 +7,222 @@
 from pykern import pkunit
 
 
+def test_fit_profiles():
+    from slicops import plot
+    import numpy
+
+    def _gaussian(size, amp, mean, sig, offset):
+        x = numpy.arange(size)
+        return amp * numpy.exp(-(((x - mean) / sig) ** 2) / 2) + offset
+
+    e = ((50, 10, 20.5, 4, 3), (65, 200, 30, 9.25, 0), (1024, 7, 600, 40, 1))
+    r = plot.fit_profiles([_gaussian(*v) for v in e], "gaussian")
+    pkunit.pkeq(len(e), len(r))
+    for v, f in zip(e, r):
+        pkunit.pkeq(v[0], len(f.fit_line))
+        pkunit.pkeq(
+            v[1:],
+            tuple(round(f.results[k], 4) for k in ("amp", "mean", "sig", "offset")),
+        )
+    r = plot.fit_profiles([_gaussian(*e[1]), numpy.zeros(20)], "moments")
+    pkunit.pkeq((200, 30), tuple(round(r[0].results[k]) for k in ("amp", "mean")))
+    pkunit.pkok(
+        abs(r[0].results.sig - e[1][3]) < 0.05, "moments sig={}", r[0].results.sig
+    )
+    pkunit.pkeq(None, r[1].results)
+    r = plot.fit_profiles([_gaussian(*e[1])], "super_gaussian")
+    pkunit.pkeq(2.0, round(r[0].results.p, 4))
+    r = plot.fit_profiles([numpy.full(10, numpy.nan)], "gaussian")
+    pkunit.pkeq(None, r[0].results)
+    pkunit.pkeq([0] * 10, r[0].fit_line.tolist())
+    with pkunit.pkexcept("invalid fit method"):
+        plot.fit_profiles([numpy.zeros(10)], "xyzzy")
+
+
+def test_fit_profiles_curve_fit():
+    from slicops import plot
+    import numpy, scipy.optimize, warnings
+
+    def _gaussian(x, amp, mean, sig, offset):
+        return amp * numpy.exp(-(((x - mean) / sig) ** 2) / 2) + offset
+
+    # noisy, off-center, and broad
+    p = list(_noisy_profiles(numpy.random.default_rng(1), 60))
+    for e, f in zip(p, plot.fit_profiles(p, "gaussian")):
+        x = numpy.arange(len(e), dtype=float)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                c = scipy.optimize.curve_fit(
+                    _gaussian,
+                    x,
+                    e,
+                    p0=plot._moments(x, e[None, :], numpy.ones((1, len(e))))[0],
+                )[0]
+        except RuntimeError:
+            continue
+        if not plot._is_beam(c[None, :], len(e))[0]:
+            continue
+        pkunit.pkok(f.results, "no fit when curve_fit={}", c)
+        pkunit.pkok(
+            abs(f.results.mean - c[1]) < 1e-3 * abs(c[2])
+            and abs(f.results.sig - abs(c[2])) < 1e-3 * abs(c[2]),
+            "fit={} != curve_fit={}",
+            f.results,
+            c,
+        )
+    x = numpy.arange(200)
+    r = plot.fit_profiles(
+        [1000 * numpy.exp(-(((x - 90) / 45) ** 2) / 2) + 10], "super_gaussian"
+    )[0].results
+    # broad gaussian is p=2 and sig * sqrt(2)
+    pkunit.pkeq((90.0, 63.6, 2.0), (round(r.mean, 1), round(r.sig, 1), round(r.p, 1)))
+
+
+def test_fit_profiles_edges():
+    from slicops import plot
+    import numpy
+
+    r = numpy.random.default_rng(2)
+    # beams at the edges of the frame and beams which fill the frame
+    e = [(558, 517.8, 15), (148, 17.6, 6)]
+    e += [(n, f * n, s) for n in (150, 600) for f in (0.05, 0.95) for s in (2, 20)]
+    e += [(n, n * f, n / 4) for n in (100, 500) for f in (0.3, 0.5, 0.7)]
+    p = [_noisy_profile(r, *v, noise=0.05) for v in e]
+    f = plot.fit_profiles(p, "gaussian")
+    for v, x in zip(e, f[:2]):
+        pkunit.pkok(x.results, "no fit for {}", v)
+    for v, x in zip(e, f):
+        if x.results is None:
+            # failures are ok, wrong answers are not
+            continue
+        pkunit.pkok(
+            abs(x.results.mean - v[1]) <= max(1, 0.1 * v[2])
+            and abs(x.results.sig - v[2]) <= max(1, 0.1 * v[2]),
+            "expect={} fit={}",
+            v,
+            x.results,
+        )
+    pkunit.pkok(sum(x.results is None for x in f) <= 2, "too many failures={}", f)
+
+
+def test_fit_image_noise():
+    from slicops import plot
+    import numpy
+
+    def _solver(*args, **kwargs):
+        raise AssertionError("noise was fit")
+
+    i = numpy.random.default_rng(3).normal(100, 20, (768, 1024))
+    s = (plot._levenberg_marquardt, plot._curve_fit)
+    plot._levenberg_marquardt = plot._curve_fit = _solver
+    try:
+        for m in "gaussian", "super_gaussian", "moments":
+            r = plot.fit_image(i, m)
+            pkunit.pkeq((None, None), (r.x.fit.results, r.y.fit.results))
+    finally:
+        plot._levenberg_marquardt, plot._curve_fit = s
+    # a dim beam in the same noise is still fit
+    x, y = numpy.meshgrid(numpy.arange(1024), numpy.arange(768))
+    i += 200 * numpy.exp(-(((x - 400) / 30) ** 2 + ((y - 300) / 20) ** 2) / 2)
+    r = plot.fit_image(i, "gaussian").x.fit.results
+    pkunit.pkok(abs(r.mean - 400) < 1 and abs(r.sig - 30) < 1, "fit={}", r)
+
+
+def test_encode_plot():
+    from slicops import plot
+    import numpy
+
+    i = numpy.random.default_rng(1).random((300, 500)) * 1000 + 7
+    f = plot.fit_image(i, "moments")
+    for b, t in (8, numpy.uint8), (16, numpy.uint16):
+        r = plot.encode_plot(f, max_size=256, bits=b)
+        e = r.raw_pixels_encoding
+        pkunit.pkeq((150, 250), r.raw_pixels.shape)
+        pkunit.pkeq(t, r.raw_pixels.dtype)
+        pkunit.pkeq((2, t.__name__), (e.downsample, e.dtype))
+        d = plot._bin(i, 2)
+        pkunit.pkok(
+            numpy.abs(e.offset + e.scale * r.raw_pixels - d).max()
+            <= e.scale / 2 + 1e-9,
+            "quantization error too large bits={}",
+            b,
+        )
+    pkunit.pkeq(i.shape, f.raw_pixels.shape)
+    pkunit.pkeq(f.x, r.x)
+    with pkunit.pkexcept("invalid bits"):
+        plot.encode_plot(f, bits=12)
+
+
+def test_fit_image_roi():
+    from pykern.pkcollections import PKDict
+    from slicops import plot
+    import numpy
+
+    x, y = numpy.meshgrid(numpy.arange(200), numpy.arange(120))
+    i = numpy.exp(-(((x - 130.5) / 6) ** 2 + ((y - 40) / 4) ** 2) / 2)
+    for w, b in (None, 1), (PKDict(x=(100, 161), y=(20, 61)), 1), (None, 2):
+        r = plot.fit_image(i, "gaussian", window=w, binning=b)
+        pkunit.pkeq(
+            (130.5, 6, 120 - 1 - 40, 4),
+            tuple(round(r[k].fit.results[a], 1) for k in "xy" for a in ("mean", "sig")),
+        )
+    pkunit.pkeq(PKDict(binning=2, y=(0, 120), x=(0, 200)), r.roi)
+    pkunit.pkeq((60, 100), r.raw_pixels.shape)
+    s = plot.ImageSet(
+        PKDict(
+            images_to_average=1,
+            camera="Test",
+            curve_fit_method="gaussian",
+            roi_size="auto",
+        )
+    )
+    pkunit.pkeq((120, 200), s.add_frame(i, None).raw_pixels.shape)
+    r = s.add_frame(i, None)
+    pkunit.pkeq(PKDict(binning=1, x=(100, 160), y=(20, 60)), r.roi)
+    pkunit.pkeq(130.5, round(r.x.fit.results.mean, 1))
+
+
+def test_imageset_rolling():
+    from datetime import datetime, timedelta
+    from glob import glob
+    from pykern import pkio
+    from pykern.pkcollections import PKDict
+    from slicops.plot import ImageSet
+    import h5py, numpy
+
+    i = ImageSet(
+        PKDict(
+            images_to_average=2,
+            camera="Test",
+            curve_fit_method="moments",
+            rolling_average=True,
+        )
+    )
+    t = datetime.strptime("2024-09-19 15:45:30", "%Y-%m-%d %H:%M:%S")
+    f = [numpy.full((4, 5), v) for v in (1, 3, 7)]
+    for k, e in enumerate((1, 2, 5)):
+        r = i.add_frame(f[k], t + timedelta(seconds=k))
+        pkunit.pkeq(numpy.full((4, 5), e).tolist(), r.raw_pixels.tolist())
+    with pkio.save_chdir(pkunit.work_dir().join("rolling").ensure(dir=True)) as w:
+        i.save_file(w)
+        with h5py.File(glob("2024-09/*.h5")[0]) as h:
+            pkunit.pkeq([3, 7], h["/meta/frames"][:, 0, 0].tolist())
+            pkunit.pkeq(
+                [(t + timedelta(seconds=k)).timestamp() for k in (1, 2)],
+                h["/meta/timestamps"][:].tolist(),
+            )
+
+
 def test_imageset_save_to_file():
+    from datetime import datetime
     from glob import glob
     from pykern import pkio
-    import h5py
+    import h5py, numpy
 
     i = _imageset()
+    # The next block does not overwrite the frames of the saved block
+    i.imageset.add_frame(numpy.full((4, 5), 9), datetime.now())
     with pkio.save_chdir(pkunit.work_dir()) as w:
         i.imageset.save_file(w)
         with h5py.File(glob("2024-09/*.h5")[0]) as h:
@@ -20,6 +230,14 @@ def test_imageset_save_to_file():
                 h["/image/mean"][:].tolist(),
                 i.expected_mean,
             )
+            pkunit.pkeq((2, 4, 5), h["/meta/frames"].shape)
+            pkunit.pkeq([0, 1], h["/meta/frames"][:, 0, 0].tolist())
+    i = _imageset(keep_frames=False)
+    with pkio.save_chdir(pkunit.work_dir().join("no_frames").ensure(dir=True)) as w:
+        i.imageset.save_file(w)
+        with h5py.File(glob("2024-09/*.h5")[0]) as h:
+            pkunit.pkeq(i.expected_mean, h["/image/mean"][:].tolist())
+            pkunit.pkok("frames" not in h["/meta"], "frames saved")
 
 
 def test_imageset_stats():
@@ -41,7 +259,110 @@ def test_imageset_stats():
     pkunit.pkeq([round(v, 2) for v in f.x.fit.fit_line], [0.5, 2.5, 12.5, 2.5, 0.5])
 
 
-def _imageset():
+def test_analyzer_latest():
+    from pykern.pkcollections import PKDict
+    from slicops import plot
+    import numpy, threading
+
+    class _ImageSet(plot.ImageSet):
+        def add_frame(self, frame, *args, **kwargs):
+            started.set()
+            release.wait(timeout=10)
+            return super().add_frame(frame, *args, **kwargs)
+
+    def _handle_fit(key, image_set, fit, received):
+        fits.append(int(fit.raw_pixels[0, 0]))
+        if len(fits) == 2:
+            done.set()
+
+    done = threading.Event()
+    fits = []
+    release = threading.Event()
+    started = threading.Event()
+    a = plot.Analyzer(_handle_fit)
+    try:
+        s = _ImageSet(
+            PKDict(images_to_average=1, camera="a", curve_fit_method="gaussian")
+        )
+        a.add_frame("a", s, numpy.full((4, 5), 1))
+        pkunit.pkok(started.wait(timeout=10), "fit did not start")
+        # Frames arriving during a fit replace the waiting frame
+        for v in 2, 3:
+            a.add_frame("a", s, numpy.full((4, 5), v))
+        release.set()
+        pkunit.pkok(done.wait(timeout=10), "fits did not complete")
+        pkunit.pkeq([1, 3], fits)
+        x = a.stats().a
+        pkunit.pkeq((1, 2), (x.drops, x.fits))
+    finally:
+        a.destroy()
+
+
+def test_analyzer():
+    from pykern.pkcollections import PKDict
+    from slicops import plot
+    import numpy, threading
+
+    done = threading.Event()
+    fits = PKDict()
+
+    def _handle_fit(key, image_set, fit, received):
+        fits[key] = fit
+        pkunit.pkeq(ord(key), received)
+        if len(fits) == 2:
+            done.set()
+
+    x, y = numpy.meshgrid(numpy.arange(50), numpy.arange(40))
+    i = numpy.exp(-(((x - 20) / 3) ** 2 + ((y - 15) / 2) ** 2) / 2)
+    a = plot.Analyzer(_handle_fit)
+    try:
+        for k in "a", "b":
+            a.add_frame(
+                k,
+                plot.ImageSet(
+                    PKDict(images_to_average=1, camera=k, curve_fit_method="gaussian")
+                ),
+                i,
+                received=ord(k),
+            )
+        pkunit.pkok(done.wait(timeout=10), "fits did not complete")
+        pkunit.pkeq(20.0, round(fits.b.x.fit.results.mean, 1))
+        s = a.stats()
+        pkunit.pkeq(1, s.a.fits)
+        pkunit.pkok(s.b.fit_secs > 0, "fit_secs not recorded")
+        pkunit.pkeq(s.a, a.forget("a"))
+        pkunit.pkeq(["b"], list(a.stats().keys()))
+    finally:
+        a.destroy()
+
+
+def test_analyzer_forget():
+    from pykern.pkcollections import PKDict
+    from slicops import plot
+    import numpy
+
+    class _ImageSet(plot.ImageSet):
+        def add_frame(self, *args, **kwargs):
+            a.forget("a")
+            return super().add_frame(*args, **kwargs)
+
+    fits = []
+    a = plot.Analyzer(lambda *args: fits.append(args), in_thread=False)
+    try:
+        a.add_frame(
+            "a",
+            _ImageSet(
+                PKDict(images_to_average=1, camera="a", curve_fit_method="gaussian")
+            ),
+            numpy.ones((4, 5)),
+        )
+        pkunit.pkeq([], fits)
+        pkunit.pkeq(PKDict(), a.stats())
+    finally:
+        a.destroy()
+
+
+def _imageset(keep_frames=True):
     from datetime import datetime
     from pykern.pkcollections import PKDict
     from slicops.plot import ImageSet
@@ -56,7 +377,8 @@ def _imageset():
             camera="Test",
             curve_fit_method="gaussian",
             pv="test",
-        )
+        ),
+        keep_frames=keep_frames,
     )
     pkunit.pkeq(
         i.add_frame(
@@ -142,3 +464,27 @@ def _imageset():
             ]
         ).tolist(),
     )
+
+
+def _noisy_profile(rng, size, mean, sig, noise):
+    import numpy
+
+    a = rng.uniform(100, 10000)
+    x = numpy.arange(size)
+    return (
+        a * numpy.exp(-(((x - mean) / sig) ** 2) / 2)
+        + rng.uniform(0, 0.2) * a
+        + rng.normal(0, noise * a, size)
+    )
+
+
+def _noisy_profiles(rng, count):
+    for _ in range(count):
+        n = int(rng.integers(50, 1000))
+        yield _noisy_profile(
+            rng,
+            n,
+            rng.uniform(0.05, 0.95) * n,
+            rng.uniform(1, n / 4),
+            rng.uniform(0.01, 0.1),
+        )
@@ -0,0 +1,40 @@
+"""Test multi_screen
+
+:copyright: Copyright (c) 2026 The Board of Trustees of the Leland Stanford Junior University, through SLAC National Accelerator Laboratory (subject to receipt of any required approvals from the U.S. Dept. of Energy).  All Rights Reserved.
+:license: http://github.com/slaclab/slicops/LICENSE
+"""
+
+import pytest
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_basic():
+    from slicops import unit_util
+
+    with unit_util.start_ioc("ioc"):
+        async with unit_util.SlicletSetup("multi_screen") as s:
+            from pykern import pkunit
+
+            r = await s.ctx_update()
+            pkunit.pkeq("DEV_BEAM_PATH", r.fields.beam_path.value)
+            pkunit.pkeq(False, r.fields.start_button.ui.enabled)
+            # Both cameras are the same IOC
+            await s.ctx_field_value_set(camera_1="DEV_CAMERA", camera_2="DEV_CAMERA2")
+            # camera_3 is cleared so color_map is the only change sent
+            await s.ctx_field_value_set(camera_3="DEV_CAMERA", color_map="Viridis")
+            while (f := (await s.ctx_update()).fields).get("color_map") is None:
+                pass
+            pkunit.pkok("camera_3" not in f, "camera already in a slot fields={}", f)
+            pkunit.pkeq(None, s.ctx_fields.camera_3.value)
+            await s.ctx_field_value_set(start_button=None)
+            p = {}
+            while len(p) < 2:
+                r = await s.ctx_update()
+                for k in "plot_1", "plot_2":
+                    # the initial (empty) image has no fit
+                    if (f := r.fields.get(k)) and f.get("value"):
+                        if f.value.x.fit.results:
+                            p[k] = f.value
+            for v in p.values():
+                pkunit.pkeq(10.00, round(v.x.fit.results.sig, 2))
+                pkunit.pkeq(13.00, round(v.y.fit.results.sig, 2))
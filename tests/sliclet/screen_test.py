@@ -13,6 +13,8 @@ _BUTTONS = tuple(f"{k}_button.ui.enabled" for k in ("start", "stop", "single"))
 async def test_basic():
     from slicops import unit_util
 
+    plots = []
+
     async def _buttons(s, expect, msg):
         from pykern import pkunit, pkdebug
         from pykern.pkdebug import pkdlog
@@ -20,20 +22,20 @@ async def test_basic():
 
         # Wait for buttons to "settle" on expect. The updates
         # are async so we can't control which update returns what.
-        while True:
+        # Updates only contain changes so check all fields received.
+        while (v := tuple(s.ctx_fields.pknested_get(k) for k in _BUTTONS)) != expect:
             try:
                 rv = await s.ctx_update()
             except CancelledError:
                 # timed out so now report mismatch via pkunit
                 pkunit.pkeq(expect, v, msg)
-            v = tuple(rv.fields.pknested_get(k) for k in _BUTTONS)
-            if v == expect:
-                break
-        return rv
+            if (p := rv.fields.get("plot")) and p.get("value"):
+                plots.append(p.value)
 
     with unit_util.start_ioc("ioc"):
         async with unit_util.SlicletSetup("screen") as s:
             from pykern import pkunit, pkdebug
+            from pykern.pkcollections import PKDict
             from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
             import asyncio
             import epics
@@ -45,21 +47,38 @@ async def test_basic():
             await s.ctx_field_value_set(start_button=None)
             await _buttons(s, (False, False, False), "all disabled after start")
             await _buttons(s, (False, True, False), "acquire should fire")
-            p = (await s.ctx_update()).fields.plot.value
+            # The initial (empty) image may be plotted, too
+            while not (plots and any(any(r) for r in plots[-1].raw_pixels)):
+                if (p := (await s.ctx_update()).fields.get("plot")) and p.get("value"):
+                    plots.append(p.value)
+            p = plots[-1]
             pkunit.pkeq(65, len(p.raw_pixels))
             pkunit.pkeq(50, len(p.raw_pixels[0]))
             # x fit should be 10
             pkunit.pkeq(10.00, round(p.x.fit.results.sig, 2))
             pkunit.pkeq(13.00, round(p.y.fit.results.sig, 2))
+            r = await s.client.call_api("latency_stats", PKDict())
+            for k in (
+                "receive",
+                "worker_queue",
+                "fsm",
+                "fit",
+                "sliclet_lock_wait",
+                "sliclet_commit",
+                "event_loop",
+                "result_put",
+                "end_to_end",
+            ):
+                pkunit.pkok(k in r.stages, "missing stage={} stages={}", k, r.stages)
             await s.ctx_field_value_set(
                 beam_path="CU_SPEC",
                 curve_fit_method="super_gaussian",
                 stop_button=None,
             )
-            r = await _buttons(s, (False, False, False), "all disabled after stop")
-            pkunit.pkeq(None, r.fields.camera.value)
+            await _buttons(s, (False, False, False), "all disabled after stop")
+            pkunit.pkeq(None, s.ctx_fields.camera.value)
             # there's no device so buttons on not visible
-            pkunit.pkeq(False, r.fields.start_button.ui.visible)
+            pkunit.pkeq(False, s.ctx_fields.start_button.ui.visible)
             with pkunit.pkexcept("unknown choice"):
                 await s.ctx_field_value_set(camera="DEV_CAMERA")
             # TODO(robnagler) better error handling await _put(ux, "camera", "DEV_CAMERA", Exception)
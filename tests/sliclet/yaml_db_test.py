@@ -13,6 +13,7 @@ async def test_basic():
 
     async with unit_util.SlicletSetup("yaml_db") as s:
         from pykern import pkunit, pkdebug
+        from pykern.pkcollections import PKDict
         from slicops.pkcli import yaml_db
         import asyncio
 
@@ -27,16 +28,75 @@ async def test_basic():
         pkunit.pkeq(1.1, r.fields.divisor.value)
         pkunit.pkeq(3.14, yaml_db.read("yaml_db").divisor)
         r = await s.ctx_field_value_set(save=None)
-        # save button
-        await s.ctx_update()
+        # save button does not change fields so there is no update
+        for _ in range(20):
+            if yaml_db.read("yaml_db").divisor == 1.1:
+                break
+            await asyncio.sleep(0.1)
         pkunit.pkeq(1.1, yaml_db.read("yaml_db").divisor)
         # no update client side
         yaml_db.write("yaml_db", "divisor=3")
         r = await s.ctx_update()
         pkunit.pkeq(3.0, r.fields.divisor.value)
+        x = await s.client.call_api("ui_ctx_resync", PKDict(version=r.version - 1))
+        pkunit.pkeq(r.version, x.version)
+        pkunit.pkeq(["divisor"], list(x.fields.keys()))
+        pkunit.pkeq("Divisor", x.fields.divisor.ui.label)
         await s.ctx_field_value_set(run_mode="method_2")
         r = await s.ctx_update()
         await s.ctx_field_value_set(revert=None)
         await s.ctx_update()
         # no update, bc no change
         pkunit.pkeq("method_1", yaml_db.read("yaml_db").run_mode)
+        # bursts of writes to the same field may be coalesced, but
+        # values arrive in order and the last one always wins
+        v = [round(1.2 + i / 10, 1) for i in range(10)]
+        for x in v:
+            await s.ctx_field_value_set(divisor=x)
+        p = -1
+        while s.ctx_fields.divisor.value != v[-1]:
+            if f := (await s.ctx_update()).fields.get("divisor"):
+                i = v.index(f.value)
+                pkunit.pkok(i > p, "out of order divisor={}", f.value)
+                p = i
+        await _coalesce(v)
+
+
+async def _coalesce(values):
+    """Burst queued behind a held lock is applied as one write"""
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from slicops.sliclet import yaml_db
+    import asyncio
+
+    class _YAMLDb(yaml_db.YAMLDb):
+        def on_click_save(self, txn, **kwargs):
+            saves.append(txn.field_value("divisor"))
+            super().on_click_save(txn, **kwargs)
+
+    saves = []
+    q = asyncio.Queue()
+    s = _YAMLDb("yaml_db", q)
+    try:
+        # Not the same as the initial divisor
+        v = [round(x + 0.05, 2) for x in values]
+        # The work thread blocks on the lock so the writes queue up
+        with s.lock_for_update():
+            for x in v:
+                s.ctx_write(PKDict(divisor=x))
+            for _ in range(3):
+                s.ctx_write(PKDict(save=None))
+        for _ in range(20):
+            if len(saves) == 3:
+                break
+            await asyncio.sleep(0.1)
+        d = []
+        while not q.empty():
+            if (f := q.get_nowait().fields.get("divisor")) and f.get("value") in v:
+                d.append(f.value)
+        pkunit.pkeq(v[-1], d[-1])
+        pkunit.pkok(len(d) <= 2, "writes={} not coalesced updates={}", len(v), d)
+        # clicks are applied once per write
+        pkunit.pkeq([v[-1]] * 3, saves)
+    finally:
+        s.session_end()